@@ -0,0 +1,266 @@
+"""
+Benchmarks for BFH.
+
+Times the main operations over records of various widths and nesting
+depths, and writes the results as JSON so that runs can be compared::
+
+    python benchmarks/bench.py --output bench.json
+    python benchmarks/bench.py --compare bench.json
+
+Each benchmark reports the best and mean time per call, in seconds, over
+`--repeat` runs of `--number` calls.
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+from bfh import GenericSchema, Mapping, Schema, __version__
+from bfh.fields import (
+    ArrayField,
+    IntegerField,
+    IsoDateString,
+    Subschema,
+    UnicodeField,
+)
+from bfh.transformations import Get, ManySubmap, ParseDate, Str
+
+WIDTHS = (10, 60)
+DEPTHS = (1, 5, 20)
+ARRAY_SIZES = (10, 1000)
+
+
+def wide_schema(width):
+    attributes = {}
+    for i in range(width):
+        if i % 2:
+            attributes["f%d" % i] = IntegerField()
+        else:
+            attributes["f%d" % i] = UnicodeField()
+    return type("Wide%d" % width, (Schema,), attributes)
+
+
+def wide_record(width):
+    return dict(("f%d" % i, i if i % 2 else u"value %d" % i)
+                for i in range(width))
+
+
+def wide_mapping(width, target_schema):
+    attributes = {"target_schema": target_schema}
+    for i in range(width):
+        attributes["f%d" % i] = Get("f%d" % i)
+    return type("ToWide%d" % width, (Mapping,), attributes)
+
+
+def nested_schema(depth):
+    schema = type("Leaf", (Schema,), {"value": UnicodeField()})
+    for i in range(depth):
+        schema = type("Nested%d" % i, (Schema,), {
+            "name": UnicodeField(),
+            "child": Subschema(schema),
+        })
+    return schema
+
+
+def nested_record(depth):
+    record = {"value": u"leaf"}
+    for i in range(depth):
+        record = {"name": u"level %d" % i, "child": record}
+    return record
+
+
+def bench_apply(width):
+    mapping = wide_mapping(width, wide_schema(width))()
+    record = wide_record(width)
+    return lambda: mapping.apply(record)
+
+
+def bench_apply_generic(width):
+    mapping = wide_mapping(width, None)()
+    record = wide_record(width)
+    return lambda: mapping.apply(record)
+
+
+def bench_serialize(width, implicit_nulls):
+    instance = wide_schema(width)(**wide_record(width))
+    return lambda: instance.serialize(implicit_nulls=implicit_nulls)
+
+
+def bench_serialize_nested(depth, implicit_nulls):
+    instance = nested_schema(depth)(**nested_record(depth))
+    return lambda: instance.serialize(implicit_nulls=implicit_nulls)
+
+
+def bench_validate(width):
+    instance = wide_schema(width)(**wide_record(width))
+    return instance.validate
+
+
+def bench_construct_nested(depth):
+    schema = nested_schema(depth)
+    record = nested_record(depth)
+    return lambda: schema(**record)
+
+
+def bench_many_submap(size):
+    class Item(Mapping):
+        name = Str(Get("name"))
+        count = Get("count")
+
+    class Items(Mapping):
+        items = ManySubmap(Item, Get("items"))
+
+    mapping = Items()
+    record = {"items": [{"name": i, "count": i} for i in range(size)]}
+    return lambda: mapping.apply(record)
+
+
+def bench_array_field(size):
+    schema = type("Samples", (Schema,), {"samples": ArrayField(int)})
+    instance = schema(samples=list(range(size)))
+    return lambda: (instance.validate(), instance.serialize())
+
+
+def bench_parse_date(value):
+    parse = ParseDate(Get("at"))
+    record = {"at": value}
+    return lambda: parse(record)
+
+
+def bench_iso_date_string():
+    schema = type("Dated", (Schema,), {"at": IsoDateString()})
+    instance = schema(at=u"2017-06-01T12:30:00Z")
+    return instance.validate
+
+
+def bench_deep_get(depth):
+    get = Get(*["k"] * depth)
+    record = u"leaf"
+    for _ in range(depth):
+        record = {"k": record}
+    return lambda: get(record)
+
+
+def bench_deep_get_object(depth):
+    get = Get(*["k"] * depth)
+    record = u"leaf"
+    for _ in range(depth):
+        record = GenericSchema(k=record)
+    return lambda: get(record)
+
+
+def benchmarks():
+    """
+    All the benchmarks.
+
+    Returns:
+        list of (name, params, function building the callable to time)
+    """
+    cases = []
+    for width in WIDTHS:
+        params = {"width": width}
+        cases.append(("apply", params, lambda w=width: bench_apply(w)))
+        cases.append(("apply_generic", params,
+                      lambda w=width: bench_apply_generic(w)))
+        cases.append(("validate", params, lambda w=width: bench_validate(w)))
+        for implicit_nulls in (False, True):
+            cases.append((
+                "serialize", dict(params, implicit_nulls=implicit_nulls),
+                lambda w=width, n=implicit_nulls: bench_serialize(w, n)))
+    for depth in DEPTHS:
+        params = {"depth": depth}
+        cases.append(("construct_nested", params,
+                      lambda d=depth: bench_construct_nested(d)))
+        for implicit_nulls in (False, True):
+            cases.append((
+                "serialize_nested", dict(params, implicit_nulls=implicit_nulls),
+                lambda d=depth, n=implicit_nulls: bench_serialize_nested(d, n)))
+        cases.append(("deep_get", params, lambda d=depth: bench_deep_get(d)))
+        cases.append(("deep_get_object", params,
+                      lambda d=depth: bench_deep_get_object(d)))
+    for size in ARRAY_SIZES:
+        params = {"size": size}
+        cases.append(("many_submap", params,
+                      lambda s=size: bench_many_submap(s)))
+        cases.append(("array_field", params,
+                      lambda s=size: bench_array_field(s)))
+    for form, value in (("iso_8601", u"2017-06-01T12:30:00.123456+02:00"),
+                        ("free_form", u"June 1 2017 12:30pm")):
+        cases.append(("parse_date", {"form": form},
+                      lambda v=value: bench_parse_date(v)))
+    cases.append(("iso_date_string", {}, bench_iso_date_string))
+    return cases
+
+
+def _key(result):
+    return (result["name"], json.dumps(result["params"], sort_keys=True))
+
+
+def run(number, repeat, only=None, baseline=None):
+    baseline = dict((_key(result), result) for result in baseline or [])
+    results = []
+    for name, params, build in benchmarks():
+        if only and name not in only:
+            continue
+        function = build()
+        times = timeit.repeat(function, number=number, repeat=repeat)
+        result = {
+            "name": name,
+            "params": params,
+            "number": number,
+            "repeat": repeat,
+            "best": min(times) / number,
+            "mean": sum(times) / len(times) / number,
+        }
+        results.append(result)
+
+        line = "%-20s %-40s %12.3f us" % (
+            name, json.dumps(params, sort_keys=True), result["best"] * 1e6)
+        before = baseline.get(_key(result))
+        if before is not None:
+            line += "  %6.2fx" % (before["best"] / result["best"])
+        print(line, file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", "-o", default="-",
+                        help="file to write the JSON results to "
+                             "(default: stdout)")
+    parser.add_argument("--number", "-n", type=int, default=1000,
+                        help="calls per run")
+    parser.add_argument("--repeat", "-r", type=int, default=5,
+                        help="runs per benchmark")
+    parser.add_argument("--only", action="append",
+                        help="run only this benchmark (may be repeated)")
+    parser.add_argument("--compare", metavar="JSON",
+                        help="results of an earlier run; print the speedup "
+                             "of each benchmark relative to it")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)["results"]
+
+    report = {
+        "bfh": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "results": run(args.number, args.repeat, only=args.only,
+                       baseline=baseline),
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,20 @@ BFH: a library for mapping schemas to other schemas.
 """
 from __future__ import absolute_import
 
-from .common import nullish, dedunder
+from functools import partial
+from weakref import WeakKeyDictionary
+
+import six
+
+from .common import _MISSING, _same_method, chunked, nullish, dedunder
+from .compiler import (
+    compile_mapping,
+    compile_serializer,
+    compile_validator,
+    declared_schema,
+    _validation_errors,
+)
+from .instrument import Profile, instrument
 from .interfaces import SchemaInterface, MappingInterface
 
 from . import exceptions
@@ -17,30 +30,242 @@ assert __version__
 __all__ = [
     "Schema",
     "Mapping",
+    "schema_view",
     "exceptions",
     "fields",
     "transformations",
 ]
 
 
-def _get_raw_value(value):
+def _forget_raw(instance):
+    """
+    A schema is being changed, so its cached `_raw` is out of date. So are
+    those of the schemas containing it, which notice when they're next
+    asked: see `_cached_raw`.
+
+    """
+    if getattr(instance, "_raw_cache", None) is not None:
+        object.__setattr__(instance, "_raw_cache", None)
+
+
+def _cached_raw(instance):
+    """
+    Returns:
+        the cached `_raw` of the instance, or None if it's out of date: if
+        the instance, or any schema whose `_raw` went into it, has changed
+        (and so has a different cache, or none)
+    """
+    cache = getattr(instance, "_raw_cache", None)
+    if cache is None:
+        return None
+    raw, nested = cache
+    for value, value_cache in nested:
+        if value_cache is None or value._raw_cache is not value_cache:
+            return None
+    return raw
+
+
+def _cache_raw(instance, raw, nested):
+    """
+    Cache the `_raw` of an instance, along with the caches of the nested
+    schemas (at any depth) that went into it.
+
+    """
+    object.__setattr__(instance, "_raw_cache", (raw, tuple(nested)))
+    return raw
+
+
+def _get_raw_value(value, nested=None):
     """
     Helper to recurse within a schema structure
 
+    Kwargs:
+        nested (list): where to note the schemas found, with their caches
     """
     if isinstance(value, SchemaInterface):
-        return value._raw
+        raw = value._raw
+        if nested is not None:
+            cache = getattr(value, "_raw_cache", None)
+            if cache is not None and cache[0] is raw:
+                nested.append((value, cache))
+                nested.extend(cache[1])
+            else:
+                nested.append((value, None))  # can't tell if it changes
+        return raw
 
     elif isinstance(value, (list, tuple)):
         result = []
         for i in value:
-            result.append(_get_raw_value(i))
+            result.append(_get_raw_value(i, nested))
         return result
 
+    elif fields._is_typed_array(value):
+        return value.tolist()
+
     else:
         return value
 
 
+def _serialize_generic_value(value, implicit_nulls=False):
+    """
+    Serialize a value, recursively descending through the object to make
+    sure any nested objects are also serialized.
+
+    """
+    if hasattr(value, "serialize"):
+        value = value.serialize(implicit_nulls=implicit_nulls)
+
+    if fields._is_typed_array(value):
+        value = value.tolist()  # numbers, none of them nullish
+
+    if isinstance(value, (list, tuple)):
+        items = []
+        for i in value:
+            ser = _serialize_generic_value(i, implicit_nulls=implicit_nulls)
+
+            if not nullish(ser, implicit_nulls=implicit_nulls):
+                items.append(ser)
+
+        value = items
+
+    if implicit_nulls and nullish(
+            value, implicit_nulls=implicit_nulls):
+        return None
+    return value
+
+
+def _serialize_generic(values, implicit_nulls=False):
+    """
+    Serialize a dict of values the way GenericSchema would.
+
+    """
+    outd = {}
+    for name, value in values.items():
+        value = _serialize_generic_value(value, implicit_nulls=implicit_nulls)
+        if implicit_nulls and nullish(
+                value, implicit_nulls=implicit_nulls):
+            pass
+        else:
+            outd[name] = value
+
+    return outd
+
+
+# how a field stores a value it's given; see `_direct_plan`
+_PLAIN, _SUBSCHEMA, _SCHEMA_ARRAY = range(3)
+
+_direct_plans = WeakKeyDictionary()
+
+
+def _direct_plan(schema_class):
+    """
+    Work out how to serialize kwargs for a schema without instantiating it.
+
+    Only possible if the schema and its fields use the stock behavior for
+    storing and serializing values.
+
+    Returns:
+        list of (name, field, storage kind) or None if not possible
+    """
+    try:
+        return _direct_plans[schema_class]
+    except KeyError:
+        pass
+
+    plan = []
+    for method in ("__init__", "__setattr__", "serialize"):
+        if not _same_method(schema_class, Schema, method):
+            plan = None
+            break
+
+    for name in (schema_class._field_names if plan is not None else ()):
+        field = schema_class._fields[name]
+        kind = type(field)
+        if not (_same_method(kind, fields.Field, "__get__") or
+                (isinstance(field, fields.Subschema)
+                 and _same_method(kind, fields.Subschema, "__get__"))):
+            plan = None
+            break
+
+        if _same_method(kind, fields.Field, "__set__"):
+            plan.append((name, field, _PLAIN))
+
+        elif (isinstance(field, fields.Subschema)
+                and _same_method(kind, fields.Subschema, "__set__")
+                and _same_method(kind, fields.Subschema, "serialize")):
+            plan.append((name, field, _SUBSCHEMA))
+
+        elif (isinstance(field, fields.ArrayField)
+                and _same_method(kind, fields.ArrayField, "__set__")
+                and _same_method(kind, fields.ArrayField, "serialize")
+                and (field.array_type is None
+                     or isinstance(field.array_type, type))):
+            if (field.array_type is not None
+                    and issubclass(field.array_type, SchemaInterface)):
+                plan.append((name, field, _SCHEMA_ARRAY))
+            else:
+                plan.append((name, field, _PLAIN))
+
+        else:
+            plan = None
+            break
+
+    _direct_plans[schema_class] = plan
+    return plan
+
+
+def _serialize_kwargs(schema_class, kwargs, implicit_nulls=False):
+    """
+    The same as `schema_class(**kwargs).serialize(implicit_nulls)`, but
+    without building the schema instance, if we can get away with it.
+
+    """
+    plan = _direct_plan(schema_class)
+    if plan is None:
+        return schema_class(**kwargs).serialize(implicit_nulls=implicit_nulls)
+
+    for k in kwargs:
+        if k.startswith("__"):
+            kwargs = dict((k.strip("_") if k.startswith("__") else k, v)
+                          for k, v in kwargs.items())
+            break
+
+    outd = {}
+    for name, field, kind in plan:
+        if name in kwargs:
+            value = kwargs[name]
+            if kind is _SUBSCHEMA and isinstance(value, dict):
+                value = _serialize_kwargs(field.subschema_class, value,
+                                          implicit_nulls=implicit_nulls)
+            elif (kind is _SCHEMA_ARRAY
+                    and isinstance(value, field.field_type)):
+                value = [
+                    _serialize_kwargs(field.array_type, i,
+                                      implicit_nulls=implicit_nulls)
+                    if isinstance(i, dict) else i
+                    for i in value
+                ]
+        elif kind is _SUBSCHEMA:
+            value = _serialize_kwargs(field.subschema_class, {},
+                                      implicit_nulls=implicit_nulls)
+        else:
+            value = None
+
+        if value is None:
+            value = field.default
+
+        value = field.serialize(value, implicit_nulls=implicit_nulls)
+        if hasattr(value, "serialize"):
+            value = value.serialize(implicit_nulls=implicit_nulls)
+
+        if implicit_nulls and nullish(value, implicit_nulls=implicit_nulls):
+            pass
+        else:
+            outd[name] = value
+
+    return outd
+
+
 class Schema(SchemaInterface):
     """
     A base class for defining your schemas:
@@ -55,7 +280,39 @@ class Schema(SchemaInterface):
             legs = IntegerField()
             noise = UnicodeField()
 
+    Set `compact = True` to store the values of the fields in slots rather
+    than in a dict per instance, for a much smaller footprint when holding
+    many instances in memory. The price is slower field access, and a
+    compact schema can't be given attributes other than its fields. Every
+    base class of a compact schema must also be compact (or have
+    `__slots__`).
+
+    Set `keep_raw_input = False` to not keep the kwargs each instance was
+    made from. They are only used by `_raw` (and so `All`), which then
+    includes just the declared fields.
+
+    `_raw` is worked out once, and worked out again only after the schema,
+    or a schema nested in it, has had an attribute set. Changes made in
+    place, inside a list or dict value, aren't noticed. Nested schemas share
+    their own `_raw`, so treat it as read-only.
+
     """
+    __slots__ = ()
+
+    compact = False
+    keep_raw_input = True
+    _raw_cache = None
+    _serializers = None
+    _validators = None
+    _eager_subschemas = ()
+
+    def __new__(cls, *args, **kwargs):
+        if cls is Schema:
+            # Schema's own slots leave room for compact subclasses; made
+            # itself, it keeps its values in a dict as it always has
+            cls = _PlainSchema
+        return object.__new__(cls)
+
     def __init__(self, *args, **kwargs):
         """
         Args:
@@ -68,28 +325,36 @@ class Schema(SchemaInterface):
         if len(args) == 1 and isinstance(args[0], dict):
             return self.__init__(**dict(args[0], **kwargs))
 
+        if self.compact is True:
+            object.__setattr__(self, "_raw_cache", None)
+
         # stash raw kwargs for downstream
-        self._raw_input = kwargs
+        if self.keep_raw_input:
+            self._raw_input = kwargs
 
-        # init any subschemas
-        for k, v in self._fields.items():
-            if isinstance(v, fields.Subschema):
-                setattr(self, k, v.subschema_class())
+        # init any subschemas that don't make themselves when first wanted
+        for k, v in self._eager_subschemas:
+            setattr(self, k, v.subschema_class())
 
         # init values passed as kwargs
+        kwarg_names = self._kwarg_names
         for k, v in kwargs.items():
-            if k.startswith("__"):
-                k = k.strip("_")
+            name = kwarg_names.get(k)
+            if name is None and k.startswith("__"):
+                name = k.strip("_")
+                if name not in self._fields:
+                    continue
 
-            if k in self._field_names:
-                setattr(self, k, v)
+            if name is not None:
+                setattr(self, name, v)
 
     def __setattr__(self, name, value):
-        name = dedunder(name)
+        _forget_raw(self)
+        name = self._attribute_names.get(name) or dedunder(name)
         object.__setattr__(self, name, value)
 
     def __getattr__(self, name):
-        name = dedunder(name)
+        name = self._attribute_names.get(name) or dedunder(name)
         return object.__getattribute__(self, name)
 
     def serialize(self, implicit_nulls=False):
@@ -105,36 +370,82 @@ class Schema(SchemaInterface):
         Returns:
             dict
         """
-        outd = {}
-        for name in self._field_names:
-            field = self._fields.get(name)
-            value = getattr(self, name)
-            if hasattr(field, "serialize"):
-                value = field.serialize(value, implicit_nulls=implicit_nulls)
+        serializers = self._serializers
+        if serializers is None:
+            serializers = self._compile_serializers()
+        return serializers[bool(implicit_nulls)](self)
+
+    @classmethod
+    def _prepare_class(cls):
+        cls._serializers = None
+        cls._validators = None
+        cls._eager_subschemas = [
+            (name, field) for name, field in cls._fields.items()
+            if isinstance(field, fields.Subschema)
+            and not _same_method(type(field), fields.Subschema, "__get__")]
+
+    @classmethod
+    def _compile_serializers(cls):
+        """
+        Generate the class's `serialize`, specialized to its fields, once
+        without and once with `implicit_nulls`.
 
-            if hasattr(value, "serialize"):
-                value = value.serialize(implicit_nulls=implicit_nulls)
+        """
+        cls._serializers = (compile_serializer(cls, implicit_nulls=False),
+                            compile_serializer(cls, implicit_nulls=True))
+        return cls._serializers
 
-            if implicit_nulls and nullish(value,
-                                          implicit_nulls=implicit_nulls):
-                pass
-            else:
-                outd[name] = value
+    @classmethod
+    def _compile_validators(cls):
+        """
+        Generate the class's `validate`, and the function behind `errors`.
 
-        return outd
+        A class that overrides `validate` is validated its own way by
+        `errors` too.
+        """
+        collect = compile_validator(cls, collect=True)
+        if not _same_method(cls, Schema, "validate"):
+            collect = _validation_errors
+        cls._validators = (compile_validator(cls), collect)
+        return cls._validators
 
     def validate(self):
         """
         Validate the values in the schema.
 
+        Stops at the first invalid value; see `errors` to find them all.
+
         Returns:
             True
 
         Raises:
             Invalid
         """
-        return all([v.validate(getattr(self, k))
-                    for k, v in self._fields.items()])
+        validators = self._validators
+        if validators is None:
+            validators = self._compile_validators()
+        return validators[0](self)
+
+    def errors(self):
+        """
+        Validate all the values in the schema, and those of its subschemas,
+        without stopping at the first invalid one.
+
+        Every item of an `ArrayField` is checked, where `validate` looks
+        only as far as the first item of an array of schemas.
+
+        Returns:
+            list of (path, Invalid), where the path names the field, dotted
+            for fields of subschemas and items of arrays, e.g.
+            `"crew.2.name"`. Empty if the schema is valid.
+        """
+        return self._errors("")
+
+    def _errors(self, prefix):
+        validators = self._validators
+        if validators is None:
+            validators = self._compile_validators()
+        return validators[1](self, prefix)
 
     @property
     def is_empty(self):
@@ -145,54 +456,76 @@ class Schema(SchemaInterface):
 
     @property
     def _raw(self):
-        out = dict(**self._raw_input)
+        raw = _cached_raw(self)
+        if raw is not None:
+            return raw
+
+        out = dict(getattr(self, "_raw_input", None) or {})
+        nested = []
         for name in self._field_names:
             value = getattr(self, name)
-            out[name] = _get_raw_value(value)
+            out[name] = _get_raw_value(value, nested)
+
+        return _cache_raw(self, GenericSchema(**out), nested)
+
+
+class _PlainSchema(Schema):
+    """
+    What `Schema()` makes.
 
-        return GenericSchema(**out)
+    """
 
 
 class GenericSchema(SchemaInterface):
     """
     A generic schema to use when none is specified.
 
+    As for `Schema`, `_raw` is worked out once, until an attribute is set.
+
     """
+    __slots__ = ("__dict__", "__weakref__", "_raw_cache")
+
     def __init__(self, **kwargs):
         """
         Args:
             kwargs (dict) - a blob from which to infer a schema
         """
+        object.__setattr__(self, "_raw_cache", None)
+
+        # nothing is cached yet, so needn't go through our __setattr__
+        set_attribute = object.__setattr__
+        if type(self) is not GenericSchema:
+            set_attribute = setattr
         for k, v in kwargs.items():
-            setattr(self, k, v)
+            set_attribute(self, k, v)
 
     def __getattr__(self, name):
+        if name.startswith("__") and name.endswith("__"):
+            # special names must be missing, or pickle and copy get confused
+            raise AttributeError(name)
         return self.__dict__.get(name)
 
+    def __setattr__(self, name, value):
+        _forget_raw(self)
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        _forget_raw(self)
+        object.__delattr__(self, name)
+
+    def __getstate__(self):
+        return self.__dict__
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
     def _serialize_value(self, value, implicit_nulls=False):
         """
         Serialize a value, recursively descending through the object to make
         sure any nested objects are also serialized.
 
         """
-        if hasattr(value, "serialize"):
-            value = value.serialize(implicit_nulls=implicit_nulls)
-
-        if isinstance(value, (list, tuple)):
-            items = []
-            for i in value:
-                ser = self._serialize_value(
-                    i, implicit_nulls=implicit_nulls)
-
-                if not nullish(ser, implicit_nulls=implicit_nulls):
-                    items.append(ser)
-
-            value = items
-
-        if implicit_nulls and nullish(
-                value, implicit_nulls=implicit_nulls):
-            return None
-        return value
+        return _serialize_generic_value(value, implicit_nulls=implicit_nulls)
 
     def serialize(self, implicit_nulls=False):
         """
@@ -204,16 +537,7 @@ class GenericSchema(SchemaInterface):
         Returns:
             dict
         """
-        outd = {}
-        for name, value in self.__dict__.items():
-            value = self._serialize_value(value, implicit_nulls=implicit_nulls)
-            if implicit_nulls and nullish(
-                    value, implicit_nulls=implicit_nulls):
-                pass
-            else:
-                outd[name] = value
-
-        return outd
+        return _serialize_generic(self.__dict__, implicit_nulls=implicit_nulls)
 
     def validate(self):
         """
@@ -228,11 +552,368 @@ class GenericSchema(SchemaInterface):
 
     @property
     def _raw(self):
+        raw = _cached_raw(self)
+        if raw is not None:
+            return raw
+
         out = dict(**self.__dict__)
+        nested = []
         for key, val in out.items():
-            out[key] = _get_raw_value(val)
+            out[key] = _get_raw_value(val, nested)
+
+        return _cache_raw(self, GenericSchema(**out), nested)
+
+
+def _projection(only):
+    """
+    Turn a list of field names into a tree, splitting dotted names:
+
+        ["a", "b.c", "b.d"] -> {"a": None, "b": {"c": None, "d": None}}
+
+    None means the whole field.
+    """
+    if only is None or isinstance(only, dict):
+        return only
+    if isinstance(only, six.string_types):
+        only = [only]
+
+    groups = {}
+    for path in only:
+        name, _, rest = path.partition(".")
+        if not rest:
+            groups[name] = None
+        elif groups.get(name, ()) is not None:
+            groups.setdefault(name, []).append(rest)
+
+    return dict((name, _projection(rest)) for name, rest in groups.items())
+
+
+def _path_names(path):
+    """
+    A source path as a tuple of text, from a dotted string or a sequence.
+
+    """
+    if isinstance(path, six.string_types):
+        path = path.split(".")
+    return tuple(six.text_type(name) for name in path)
+
+
+def _overlaps(path, other):
+    """
+    Is one path a prefix of the other? Then a change at one may change
+    what is found at the other.
+
+    """
+    length = min(len(path), len(other))
+    return path[:length] == other[:length]
+
+
+class _LazyField(object):
+    """
+    Stands in for a field on a lazily-evaluated target schema, computing the
+    field's transformation the first time the field is read.
+
+    """
+    def __init__(self, name, field):
+        self.name = name
+        self.field = field
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self.field
+
+        # only forget the transformation once it has worked, so one that
+        # fails fails again, rather than leaving the default
+        transform = instance._pending.get(self.name)
+        if transform is not None:
+            self.field.__set__(instance, transform(instance._lazy_source))
+            instance._pending.pop(self.name, None)
+        return self.field.__get__(instance, cls)
+
+    def __set__(self, instance, value):
+        instance._pending.pop(self.name, None)
+        self.field.__set__(instance, value)
+
+
+def _uninitialized(schema_class):
+    return schema_class.__new__(schema_class)
+
+
+class _LazySchema(object):
+    """
+    Mixin for target schemas whose fields are computed on first access.
+
+    """
+    __slots__ = ()
+
+    def _force(self):
+        """
+        Compute everything still pending.
+
+        """
+        pending = self._pending
+        for name, transform in list(pending.items()):
+            value = transform(self._lazy_source)
+            if name in self._fields:
+                setattr(self, name, value)
+            elif getattr(self, "_raw_input", None) is not None:
+                self._raw_input[name] = value
+            pending.pop(name, None)
+
+    def __reduce__(self):
+        self._force()
+        # lazy classes are made at run time, so pickle as the schema itself
+        return _uninitialized, (self._eager_class,), dict(self.__dict__)
+
+    @property
+    def _raw(self):
+        self._force()
+        return super(_LazySchema, self)._raw
+
+
+_lazy_classes = WeakKeyDictionary()
+
 
-        return GenericSchema(**out)
+def _lazy_class(schema_class):
+    """
+    Make (or find) a lazily-evaluated subclass of a target schema.
+
+    """
+    try:
+        return _lazy_classes[schema_class]
+    except KeyError:
+        pass
+
+    attributes = {
+        "__slots__": ("_pending", "_lazy_source"),
+        "__module__": schema_class.__module__,
+        "_eager_class": schema_class,
+    }
+    for name, field in schema_class._fields.items():
+        attributes[name] = _LazyField(name, field)
+
+    lazy_class = type("Lazy" + schema_class.__name__,
+                      (_LazySchema, schema_class), attributes)
+    _lazy_classes[schema_class] = lazy_class
+    return lazy_class
+
+
+class _LazyGenericSchema(GenericSchema):
+    """
+    A GenericSchema whose values are computed on first access.
+
+    """
+    __slots__ = ("_pending", "_lazy_source")
+
+    def __getattr__(self, name):
+        transform = self._pending.get(name)
+        if transform is None:
+            return super(_LazyGenericSchema, self).__getattr__(name)
+
+        value = transform(self._lazy_source)
+        setattr(self, name, value)
+        self._pending.pop(name, None)
+        return value
+
+    def _force(self):
+        pending = self._pending
+        for name, transform in list(pending.items()):
+            setattr(self, name, transform(self._lazy_source))
+            pending.pop(name, None)
+
+    def serialize(self, implicit_nulls=False):
+        self._force()
+        return super(_LazyGenericSchema, self).serialize(
+            implicit_nulls=implicit_nulls)
+
+    def __getstate__(self):
+        self._force()
+        return super(_LazyGenericSchema, self).__getstate__()
+
+    def __setstate__(self, state):
+        object.__setattr__(self, "_pending", {})
+        object.__setattr__(self, "_lazy_source", None)
+        super(_LazyGenericSchema, self).__setstate__(state)
+
+    def validate(self):
+        self._force()
+        return super(_LazyGenericSchema, self).validate()
+
+    @property
+    def is_empty(self):
+        self._force()
+        return super(_LazyGenericSchema, self).is_empty
+
+    @property
+    def _raw(self):
+        self._force()
+        return super(_LazyGenericSchema, self)._raw
+
+
+class _ViewField(object):
+    """
+    Stands in for a field on a schema view, reading the field's value from
+    the viewed dict as the field would have stored it.
+
+    """
+    def __init__(self, name, field, kind, keys):
+        self.name = name
+        self.field = field
+        self.kind = kind
+        self.aliases = tuple(key for key in keys if key != name)
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self.field
+
+        data = instance._view_data
+        value = data.get(self.name, _MISSING)
+        if value is _MISSING:
+            for key in self.aliases:
+                value = data.get(key, _MISSING)
+                if value is not _MISSING:
+                    break
+
+        kind = self.kind
+        if kind is _PLAIN or (kind is _SCHEMA_ARRAY and not isinstance(
+                value, self.field.field_type)):
+            if value is not None and value is not _MISSING:
+                return value
+        elif kind is _SUBSCHEMA and not (
+                value is _MISSING or isinstance(value, dict)):
+            if value is not None:
+                return value
+
+        # everything else is worked out once per view
+        values = instance._view_values
+        try:
+            return values[self.name]
+        except KeyError:
+            pass
+
+        field = self.field
+        if value is None or (value is _MISSING and kind is not _SUBSCHEMA):
+            value = field.default
+        elif kind is _SUBSCHEMA:
+            value = schema_view(field.subschema_class,
+                                {} if value is _MISSING else value)
+        else:
+            value = [schema_view(field.array_type, i)
+                     if isinstance(i, dict) else i
+                     for i in value]
+        values[self.name] = value
+        return value
+
+    def __set__(self, instance, value):
+        raise AttributeError("%s is a read-only view" %
+                             type(instance).__name__)
+
+
+def _unviewed(schema_class, data):
+    return schema_class(**data)
+
+
+class _SchemaView(object):
+    """
+    Mixin for views: schemas that read their fields from a dict they were
+    given, rather than copying its values.
+
+    """
+    __slots__ = ()
+
+    def __init__(self, data):
+        object.__setattr__(self, "_view_data", data)
+        object.__setattr__(self, "_view_values", {})
+        if self.compact is True:
+            object.__setattr__(self, "_raw_cache", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is a read-only view" % type(self).__name__)
+
+    def __reduce__(self):
+        # view classes are made at run time, so copy into the schema itself
+        return _unviewed, (self._viewed_class, self._view_data)
+
+    def _unviewed(self):
+        """
+        A schema instance of its own, with the values of the view.
+
+        """
+        return _unviewed(self._viewed_class, self._view_data)
+
+    @property
+    def _raw_input(self):
+        if self.keep_raw_input:
+            return self._view_data
+        return None
+
+
+_view_classes = WeakKeyDictionary()
+
+
+def _view_class(schema_class):
+    """
+    Make (or find) the view class of a schema.
+
+    Returns:
+        the class, or None if the schema or its fields customize how
+        values are stored, so can't be viewed
+    """
+    try:
+        return _view_classes[schema_class]
+    except KeyError:
+        pass
+
+    plan = _direct_plan(schema_class)
+    if plan is None or not _same_method(schema_class, Schema, "__getattr__"):
+        view_class = None
+    else:
+        keys = {}
+        for key, name in schema_class._kwarg_names.items():
+            keys.setdefault(name, []).append(key)
+
+        attributes = {
+            "__slots__": ("_view_data", "_view_values"),
+            "__module__": schema_class.__module__,
+            "_viewed_class": schema_class,
+        }
+        for name, field, kind in plan:
+            attributes[name] = _ViewField(name, field, kind,
+                                          sorted(keys.get(name, ())))
+        view_class = type(schema_class.__name__ + "View",
+                          (_SchemaView, schema_class), attributes)
+
+    _view_classes[schema_class] = view_class
+    return view_class
+
+
+def schema_view(schema_class, data):
+    """
+    A read-only instance of a schema over a dict, without copying the dict.
+
+    Reading a field gives what it would on `schema_class(**data)`: values
+    are read from `data` when wanted, and nested dicts of `Subschema` (and
+    schema `ArrayField`) fields are viewed in turn. The view is an instance
+    of `schema_class`, so serializes, validates and gives `_raw` just the
+    same, but its fields can't be set. Don't change `data` while the view
+    is in use. Setting a view on a `Subschema` (or schema `ArrayField`)
+    field, and copying or pickling it, copies it into a `schema_class`
+    instance of its own.
+
+    Schemas whose fields customize how they store values can't be viewed,
+    so are instantiated as usual.
+
+    Args:
+        schema_class (bfh.Schema): the schema to view the dict as
+        data (dict): the values
+
+    Returns:
+        instance of `schema_class`
+    """
+    view_class = _view_class(schema_class)
+    if view_class is None:
+        return schema_class(**data)
+    return view_class(data)
 
 
 class Mapping(MappingInterface):
@@ -267,23 +948,247 @@ class Mapping(MappingInterface):
         my_animal.serialize()
         # {"name": "Fido", "type": "dog", "legs": 4, "noise": "woof!}
 
+    Set `compiled = True` on your mapping to have `apply` generated as a
+    single function when the class is created (see `bfh.compiler`)::
+
+        class FastDogToAnimal(DogToAnimal):
+            compiled = True
+
+    Set `instrumented = True` to time each field's transformations as they
+    are applied; the numbers are kept in the class's `profile` (see
+    `bfh.instrument`).
+
+    Set `source_view = True` to read dicts through a read-only view of the
+    source schema (see `schema_view`), rather than copying them into a
+    source schema instance. Transformations mustn't then modify the source.
+
     """
-    def apply(self, blob):
+    compiled = False
+    instrumented = False
+    source_view = False
+    #: the `bfh.instrument.Profile` of an instrumented mapping
+    profile = None
+    _compiled_apply = None
+    _compiled_values = None
+    _dependencies = None
+
+    @classmethod
+    def _prepare_class(cls):
+        cls._dependencies = None
+
+        if cls.instrumented is True:
+            cls.profile = Profile()
+            for name, transform in list(cls._fields.items()):
+                cls._fields[name] = instrument(transform, cls.profile, name)
+        else:
+            cls.profile = None
+
+        if cls.compiled is not True:
+            cls._compiled_apply = None
+            cls._compiled_values = None
+            return
+
+        target_factory = declared_schema(cls, "target_schema") or GenericSchema
+        source_factory = cls._source_view_class()
+        cls._compiled_apply = staticmethod(
+            compile_mapping(cls, target_factory, source_factory))
+        cls._compiled_values = staticmethod(
+            compile_mapping(cls, source_factory=source_factory))
+
+    @classmethod
+    def _source_view_class(cls):
+        """
+        The view class to load dicts with, if there is to be one.
+
+        """
+        source_schema = declared_schema(cls, "source_schema")
+        if cls.source_view is not True or source_schema is None:
+            return None
+        return _view_class(source_schema)
+
+    def apply(self, blob, lazy=False, only=None):
         """
         Take the mapping and push a blob through it.
 
         Args:
             blob (dict or Schema): the thing to transform
 
+        Kwargs:
+            lazy (bool): don't transform anything yet. Instead, each field is
+                transformed when it is first read, so fields that are never
+                read are never computed. Serializing or validating the
+                result reads every field. Note that errors in the
+                transformations are raised when the field is read.
+
+            only (list of str): transform only these fields; the rest are
+                left at their defaults. Name fields inside a `Submapping` or
+                `ManySubmap` with dots, e.g. `"author.name"`. Names that the
+                mapping doesn't map are ignored.
+
         Returns:
             instance of `self.target_schema` (if declared) or GenericSchema
         """
-        if self.source_schema is None:
-            loaded_source = blob
-        elif isinstance(blob, self.source_schema):
-            loaded_source = blob
-        else:
-            loaded_source = self.source_schema(**blob or {})
+        if lazy:
+            return self._apply_lazily(blob, only=only)
+
+        if self._compiled_apply is not None and only is None:
+            return self._compiled_apply(blob)
+
+        target_dict = self._values(blob, only=only)
+
+        if self.target_schema is None:
+            return GenericSchema(**target_dict)
+
+        return self.target_schema(**target_dict)
+
+    def apply_serialized(self, blob, implicit_nulls=False, only=None):
+        """
+        Push a blob through the mapping and serialize the result.
+
+        Gives the same result as `apply(blob).serialize(implicit_nulls)`, but
+        where the target schema uses stock fields, builds the output dict
+        directly rather than building schema instances along the way.
+
+        Args:
+            blob (dict or Schema): the thing to transform
+
+        Kwargs:
+            implicit_nulls (bool): drop any keys whose value is nullish
+            only (list of str): transform only these fields, as for `apply`
+
+        Returns:
+            dict
+        """
+        if not _same_method(type(self), Mapping, "apply"):
+            # it does something of its own
+            result = (self.apply(blob) if only is None
+                      else self.apply(blob, only=only))
+            return result.serialize(implicit_nulls=implicit_nulls)
+
+        target_dict = self._values(blob, only=only)
+
+        if self.target_schema is None:
+            return _serialize_generic(target_dict,
+                                      implicit_nulls=implicit_nulls)
+
+        return _serialize_kwargs(self.target_schema, target_dict,
+                                 implicit_nulls=implicit_nulls)
+
+    @classmethod
+    def dependencies(cls):
+        """
+        Work out which source paths each field is computed from, by
+        following the `Get` paths in its transformations.
+
+        Returns:
+            dict of field name to a frozenset of paths (tuples of names),
+            or to None if the field may depend on anything in the source
+        """
+        if cls._dependencies is None:
+            cls._dependencies = dict(
+                (name, transform.dependencies())
+                for name, transform in cls._fields.items())
+        return cls._dependencies
+
+    def affected_fields(self, changed_paths):
+        """
+        Which fields might change when these source paths change?
+
+        Args:
+            changed_paths (list): paths into the source, as dotted strings
+                (`"author.name"`) or sequences of names
+
+        Returns:
+            list of field names
+        """
+        changed = [_path_names(path) for path in changed_paths]
+        affected = []
+        for name, paths in self.dependencies().items():
+            if paths is None:
+                if changed:
+                    affected.append(name)
+                continue
+            for path in paths:
+                path = _path_names(path)
+                if any(_overlaps(path, other) for other in changed):
+                    affected.append(name)
+                    break
+        return affected
+
+    def apply_incremental(self, previous_result, changed_source,
+                          changed_paths, implicit_nulls=False):
+        """
+        Update the result of an earlier `apply` after part of the source
+        changed, transforming only the fields that depend on what changed.
+
+        Fields that don't depend on the changed paths keep their values from
+        the previous result (which are shared, not copied). The previous
+        result isn't modified.
+
+        Args:
+            previous_result (Schema or dict): what `apply` (or
+                `apply_serialized`) gave for the source before the change
+            changed_source (dict or Schema): the whole source, as it is now
+            changed_paths (list): the paths into the source that changed, as
+                dotted strings (`"author.name"`) or sequences of names
+
+        Kwargs:
+            implicit_nulls (bool): if `previous_result` is a dict, as passed
+                to `apply_serialized`
+
+        Returns:
+            the updated result, of the same kind as `previous_result`
+        """
+        affected = self.affected_fields(changed_paths)
+        loaded_source = self._load_source(changed_source) if affected else None
+        values = dict((name, self._fields[name](loaded_source))
+                      for name in affected)
+
+        if isinstance(previous_result, dict):
+            if self.target_schema is None:
+                fresh = _serialize_generic(values,
+                                           implicit_nulls=implicit_nulls)
+            else:
+                fresh = _serialize_kwargs(self.target_schema, values,
+                                          implicit_nulls=implicit_nulls)
+            result = dict(previous_result)
+            for name in affected:
+                result.pop(name, None)
+                if name in fresh:
+                    result[name] = fresh[name]
+            return result
+
+        # the target schema may not have a field for everything mapped;
+        # those values are only found in what it was given
+        raw_input = getattr(previous_result, "_raw_input", None) or {}
+        for name in self._fields:
+            if name not in values:
+                value = getattr(previous_result, name, _MISSING)
+                if value is _MISSING:
+                    value = raw_input.get(name, _MISSING)
+                if value is not _MISSING:
+                    values[name] = value
+
+        if self.target_schema is None:
+            return GenericSchema(**values)
+        return self.target_schema(**values)
+
+    def _values(self, blob, only=None):
+        """
+        Apply the transformations to a blob.
+
+        Returns:
+            dict of the transformed values, by name
+        """
+        if only is not None:
+            loaded_source = self._load_source(blob)
+            return dict((name, transform(loaded_source))
+                        for name, transform in self._transforms(only))
+
+        if self._compiled_values is not None:
+            return self._compiled_values(blob)
+
+        loaded_source = self._load_source(blob)
 
         all_attrs = self._fields.keys()
         target_dict = {}
@@ -292,7 +1197,117 @@ class Mapping(MappingInterface):
             result = transform(loaded_source)
             target_dict[attr_name] = result
 
+        return target_dict
+
+    def _transforms(self, only=None):
+        """
+        The transformations to apply, restricted to a projection.
+
+        Returns:
+            list of (name, callable taking the loaded source)
+        """
+        only = _projection(only)
+        if only is None:
+            return list(self._fields.items())
+
+        transforms = []
+        for name, subprojection in only.items():
+            transform = self._fields.get(name)
+            if transform is None:
+                continue
+            if subprojection is not None and hasattr(transform, "project"):
+                transform = partial(transform.project, only=subprojection)
+            transforms.append((name, transform))
+        return transforms
+
+    def _load_source(self, blob):
+        """
+        Get a blob into the shape of the source schema, if there is one.
+
+        """
+        if self.source_schema is None:
+            return blob
+        elif isinstance(blob, self.source_schema):
+            return blob
+        elif self.source_view is True:
+            view_class = _view_class(self.source_schema)
+            if view_class is not None:
+                return view_class(blob or {})
+        return self.source_schema(**blob or {})
+
+    def _apply_lazily(self, blob, only=None):
         if self.target_schema is None:
-            return GenericSchema(**target_dict)
+            target = _LazyGenericSchema()
+        else:
+            lazy_class = _lazy_class(self.target_schema)
+            target = lazy_class.__new__(lazy_class)
+            target._pending = {}
+            target.__init__()
 
-        return self.target_schema(**target_dict)
+        target._lazy_source = self._load_source(blob)
+        target._pending = dict(self._transforms(only))
+        return target
+
+    def apply_many(self, blobs, chunk_size=None, only=None):
+        """
+        Push a stream of blobs through the mapping.
+
+        Results are produced lazily, one input at a time, so this is safe to
+        use on a generator over a file too big to hold in memory. The work
+        of looking up schemas and fields is done once, not per blob.
+
+        Args:
+            blobs (iterable of dict or Schema): the things to transform
+
+        Kwargs:
+            chunk_size (int): if given, yield lists of up to this many results
+                rather than one result at a time
+            only (list of str): transform only these fields, as for `apply`
+
+        Returns:
+            iterator of the results of `apply` (or lists of them)
+        """
+        results = six.moves.map(self._applier(only=only), blobs)
+        if chunk_size is None:
+            return results
+        return chunked(results, chunk_size)
+
+    def _applier(self, only=None):
+        """
+        Build a function equivalent to `apply`, with everything that doesn't
+        depend on the blob looked up in advance.
+
+        """
+        if not _same_method(type(self), Mapping, "apply"):
+            # it does something of its own
+            if only is None:
+                return self.apply
+            return partial(self.apply, only=only)
+
+        if self._compiled_apply is not None and only is None:
+            return self._compiled_apply
+
+        source_schema = self.source_schema
+        target_factory = self.target_schema or GenericSchema
+        transforms = self._transforms(only)
+        view_class = self._source_view_class()
+        load_source = None
+        if not _same_method(type(self), Mapping, "_load_source"):
+            load_source = self._load_source
+
+        def apply_one(blob):
+            if load_source is not None:
+                loaded_source = load_source(blob)
+            elif source_schema is None or isinstance(blob, source_schema):
+                loaded_source = blob
+            elif view_class is not None:
+                loaded_source = view_class(blob or {})
+            else:
+                loaded_source = source_schema(**blob or {})
+
+            target_dict = {}
+            for attr_name, transform in transforms:
+                target_dict[attr_name] = transform(loaded_source)
+            return target_factory(**target_dict)
+
+        return apply_one
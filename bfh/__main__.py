@@ -0,0 +1,9 @@
+"""
+Run a mapping over JSON Lines: `python -m bfh module:MappingClass ...`
+
+"""
+import sys
+
+from bfh.cli import main
+
+sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Validate batches of records a column at a time.
+
+Validating records one at a time builds a schema instance for each, and
+asks every field about every value. `validate_batch` takes the records as
+they come (a list of dicts, or a dict of columns) and checks each field's
+values together, without building instances::
+
+    mask = validate_batch(Animal, records)
+    good = [record for record, bad in zip(records, mask) if not bad]
+
+A record is marked bad exactly when `Animal(**record).validate()` would
+raise `Invalid` (or return False).
+
+Values that the stock fields' type checks pass are let through a column
+at a time; only the rest are handed to the field to validate, one by one.
+The records of subschemas are validated as a batch in turn. Schemas and
+fields that customize how values are stored, or how a schema validates,
+are validated record by record as usual.
+
+Columns may be typed arrays: a NumPy array of booleans or numbers, or an
+`array.array`. All the values in such a column are of the same type, so
+checking one checks them all. (NumPy itself isn't needed for this.)
+"""
+from __future__ import absolute_import
+
+from weakref import WeakKeyDictionary
+
+from . import Schema, _direct_plan, _SUBSCHEMA
+from .common import _MISSING, _class_attribute, _same_method, nullish
+from .compiler import compile_column_check
+from .exceptions import Invalid
+from .fields import ArrayField, SimpleTypeField, Subschema, _is_typed_array
+from .interfaces import SchemaInterface
+
+__all__ = [
+    "validate_batch",
+]
+
+_column_checks = WeakKeyDictionary()
+
+
+def _column_check(field):
+    try:
+        return _column_checks[field]
+    except KeyError:
+        check = _column_checks[field] = compile_column_check(field)
+        return check
+
+
+def _valid(validate, *args):
+    try:
+        return bool(validate(*args))
+    except Invalid:
+        return False
+
+
+def _is_empty(schema_class, record):
+    """
+    Would `schema_class(**record)` be empty? Only builds it to find out when
+    no value says otherwise.
+
+    """
+    if (_direct_plan(schema_class) is not None
+            and _class_attribute(schema_class, "is_empty")
+            is vars(Schema)["is_empty"]):
+        kwarg_names = schema_class._kwarg_names
+        for key, value in record.items():
+            # a dict may yet make an empty subschema
+            if (key in kwarg_names and type(value) is not dict
+                    and not nullish(value)):
+                return False
+    return schema_class(**record).is_empty
+
+
+def _record_mask(schema_class, rows):
+    """
+    Validate records one at a time.
+
+    """
+    return [not _valid(schema_class(**row).validate) for row in rows]
+
+
+def _field_keys(schema_class):
+    """
+    The keys each field may be given by, its own name first.
+
+    """
+    keys = dict((name, [name]) for name in schema_class._field_names)
+    for key, name in sorted(schema_class._kwarg_names.items()):
+        if key != name:
+            keys[name].append(key)
+    return keys
+
+
+def _columns_of_rows(schema_class, rows):
+    given = set()
+    for row in rows:
+        given.update(row)
+
+    columns = {}
+    for name, keys in _field_keys(schema_class).items():
+        column = [row.get(name, _MISSING) for row in rows]
+        aliases = [key for key in keys[1:] if key in given]
+        if aliases:
+            for i, row in enumerate(rows):
+                if any(key in row for key in aliases):
+                    # as for the schema, the last key given wins
+                    for key, value in row.items():
+                        if key in keys:
+                            column[i] = value
+        columns[name] = column
+    return columns
+
+
+def _select_columns(schema_class, columns, count):
+    selected = dict((name, [_MISSING] * count)
+                    for name in schema_class._field_names)
+    kwarg_names = schema_class._kwarg_names
+    for key, column in columns.items():
+        name = kwarg_names.get(key)
+        if name is not None:
+            selected[name] = column
+    return selected
+
+
+def _check_column(field, kind, column, mask):
+    """
+    Mark the records whose value for a field isn't valid.
+
+    """
+    if _is_typed_array(column):
+        check = _column_check(field)
+        if check is not None and not check(column[:1].tolist()):
+            return  # one type of value, and it's valid
+        column = column.tolist()
+
+    if kind is _SUBSCHEMA:
+        values = [{} if value is _MISSING
+                  else field.default if value is None else value
+                  for value in column]
+    else:
+        values = [field.default if value is None or value is _MISSING
+                  else value for value in column]
+
+    check = _column_check(field)
+    todo = range(len(values)) if check is None else check(values)
+
+    # dicts that the field would make into schemas to validate, by record
+    nested, nested_class = {}, None
+    kind = type(field)
+    if (isinstance(field, Subschema)
+            and _same_method(kind, Subschema, "validate")):
+        nested_class = field.subschema_class
+        nested = dict((i, values[i]) for i in todo if not mask[i]
+                      and type(values[i]) is dict)
+        if not field.required:
+            # an empty one is fine if not required
+            empty = set(i for i, record in nested.items()
+                        if _is_empty(nested_class, record))
+            todo = [i for i in todo if i not in empty]
+            for i in empty:
+                del nested[i]
+
+    elif (isinstance(field, ArrayField)
+            and _same_method(kind, ArrayField, "validate")
+            and _same_method(kind, SimpleTypeField, "_valid")
+            and isinstance(field.array_type, type)
+            and issubclass(field.array_type, SchemaInterface)):
+        # the field validates an array's first item, and no more
+        nested_class = field.array_type
+        nested = dict((i, values[i][0]) for i in todo if not mask[i]
+                      and type(values[i]) in (list, tuple) and values[i]
+                      and type(values[i][0]) is dict)
+
+    validate = field.validate
+    for i in todo:
+        if not mask[i] and i not in nested and not _valid(validate,
+                                                          values[i]):
+            mask[i] = True
+
+    if nested:
+        indexes = list(nested)
+        nested_mask = validate_batch(nested_class,
+                                     [nested[i] for i in indexes])
+        for i, bad in zip(indexes, nested_mask):
+            if bad:
+                mask[i] = True
+
+
+def validate_batch(schema_class, records):
+    """
+    Validate many records of a schema.
+
+    Args:
+        schema_class (bfh.Schema): the schema to validate the records as
+        records (list of dict, or dict of lists): the records, or their
+            values as columns, by name
+
+    Returns:
+        list of bool, one per record: True if the record is not valid
+
+    Raises:
+        ValueError if the columns are of different lengths
+    """
+    if isinstance(records, dict):
+        lengths = set(len(column) for column in records.values())
+        if len(lengths) > 1:
+            raise ValueError("columns of different lengths: %s" % sorted(
+                lengths))
+        count = lengths.pop() if lengths else 0
+        rows = None
+    else:
+        rows = list(records)
+        count = len(rows)
+
+    plan = _direct_plan(schema_class)
+    if plan is None or not _same_method(schema_class, Schema, "validate"):
+        if rows is None:
+            names = list(records)
+            rows = [dict(zip(names, values))
+                    for values in zip(*[records[name] for name in names])]
+        return _record_mask(schema_class, rows)
+
+    if rows is None:
+        columns = _select_columns(schema_class, records, count)
+    else:
+        columns = _columns_of_rows(schema_class, rows)
+
+    mask = [False] * count
+    for name, field, kind in plan:
+        _check_column(field, kind, columns[name], mask)
+    return mask
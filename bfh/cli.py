@@ -0,0 +1,228 @@
+"""
+Run a mapping over a file of JSON Lines.
+
+::
+
+    python -m bfh mypackage.mappings:DogToAnimal dogs.jsonl -o animals.jsonl
+
+Each line of the input is parsed, pushed through the mapping, serialized
+and written out as a line of JSON. The input is read a line at a time and
+the output written as it is produced, so memory use doesn't grow with the
+size of the input. Read from stdin and write to stdout by default.
+
+By default the first record that fails stops the run. Give `--errors` a
+file to write the failures to instead, one JSON object per line with the
+line number, the input and the error, and carry on.
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import datetime
+import importlib
+import io
+import json
+import sys
+from functools import partial
+
+import six
+
+from .exceptions import Invalid
+from .executor import MappingExecutor
+
+__all__ = [
+    "main",
+    "process_line",
+]
+
+BUFFER_SIZE = 1 << 16
+
+
+def load_mapping(spec):
+    """
+    Import a mapping class.
+
+    Args:
+        spec (str): `module:MappingClass`, e.g. `"my.mappings:DogToAnimal"`
+
+    Returns:
+        the class
+    """
+    module_name, _, class_name = spec.partition(":")
+    if not module_name or not class_name:
+        raise ValueError("expected module:MappingClass, not %r" % spec)
+    module = importlib.import_module(module_name)
+    mapping_class = module
+    for name in class_name.split("."):
+        mapping_class = getattr(mapping_class, name)
+    return mapping_class
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError("%r is not JSON serializable" % (value,))
+
+
+def _dumps(value):
+    return six.text_type(json.dumps(value, default=_json_default,
+                                    sort_keys=True))
+
+
+def process_line(mapping, numbered_line, implicit_nulls=False,
+                 validate=False):
+    """
+    Push one line of JSON through a mapping.
+
+    Args:
+        mapping (bfh.Mapping): the mapping to apply
+        numbered_line (tuple): the line number and the line
+
+    Kwargs:
+        implicit_nulls (bool): passed on to `serialize`
+        validate (bool): validate each result before serializing it
+
+    Returns:
+        (True, JSON of the result), or (False, JSON describing the error)
+    """
+    number, line = numbered_line
+    try:
+        blob = json.loads(line)
+        if validate:
+            result = mapping.apply(blob)
+            if not result.validate():
+                raise Invalid("%s is not valid" % type(result).__name__)
+            result = result.serialize(implicit_nulls=implicit_nulls)
+        else:
+            result = mapping.apply_serialized(blob,
+                                              implicit_nulls=implicit_nulls)
+        return True, _dumps(result)
+    except Exception as error:
+        return False, _dumps({
+            "line": number,
+            "input": line.rstrip("\n"),
+            "error": "%s: %s" % (type(error).__name__, error),
+        })
+
+
+def _numbered_lines(lines):
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            yield number, line
+
+
+def run(mapping_class, lines, output, errors=None, workers=None,
+        chunk_size=100, implicit_nulls=False, validate=False):
+    """
+    Map lines of JSON to lines of JSON.
+
+    Args:
+        mapping_class (bfh.Mapping): the mapping to apply
+        lines (iterable of str): the input
+        output (file): where to write the results
+
+    Kwargs:
+        errors (file): where to write failures. If not given, the first
+            failure raises ValueError.
+        workers (int): apply the mapping in this many worker processes
+        chunk_size (int): lines to send to a worker at a time
+        implicit_nulls (bool): passed on to `serialize`
+        validate (bool): validate each result before serializing it
+
+    Returns:
+        (number of records written, number of failures)
+    """
+    process = partial(process_line, implicit_nulls=implicit_nulls,
+                      validate=validate)
+    numbered = _numbered_lines(lines)
+
+    executor = None
+    if workers:
+        executor = MappingExecutor(mapping_class, processes=workers,
+                                   chunk_size=chunk_size, function=process)
+        results = executor.map(numbered)
+    else:
+        results = six.moves.map(partial(process, mapping_class()), numbered)
+
+    written = failed = 0
+    try:
+        for ok, text in results:
+            if ok:
+                output.write(text)
+                output.write(u"\n")
+                written += 1
+            elif errors is None:
+                raise ValueError(text)
+            else:
+                errors.write(text)
+                errors.write(u"\n")
+                failed += 1
+    finally:
+        if executor is not None:
+            executor.close()
+    return written, failed
+
+
+def _open(path, mode):
+    if path == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        return io.open(stream.fileno(), mode, encoding="utf-8",
+                       buffering=BUFFER_SIZE, closefd=False)
+    return io.open(path, mode, encoding="utf-8", buffering=BUFFER_SIZE)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bfh", description="Apply a mapping to JSON Lines.")
+    parser.add_argument("mapping", help="the mapping, as module:MappingClass")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="JSON Lines to read (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="where to write the results (default: stdout)")
+    parser.add_argument("--errors", metavar="PATH",
+                        help="write failed records here and carry on, "
+                             "rather than stopping at the first")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help="apply the mapping in this many processes")
+    parser.add_argument("--chunk-size", type=int, default=100,
+                        help="records to send to a worker at a time")
+    parser.add_argument("--implicit-nulls", action="store_true",
+                        help="drop keys whose value is nullish")
+    parser.add_argument("--validate", action="store_true",
+                        help="validate each result against the target schema")
+    args = parser.parse_args(argv)
+
+    # as for `python -m`, find mappings in the current directory
+    if "" not in sys.path:
+        sys.path.insert(0, "")
+
+    try:
+        mapping_class = load_mapping(args.mapping)
+    except (ImportError, AttributeError, ValueError) as error:
+        parser.error("can't load %s: %s" % (args.mapping, error))
+
+    streams = []
+    try:
+        lines = _open(args.input, "r")
+        streams.append(lines)
+        output = _open(args.output, "w")
+        streams.append(output)
+        errors = None
+        if args.errors:
+            errors = _open(args.errors, "w")
+            streams.append(errors)
+
+        written, failed = run(
+            mapping_class, lines, output, errors=errors,
+            workers=args.workers, chunk_size=args.chunk_size,
+            implicit_nulls=args.implicit_nulls, validate=args.validate)
+    except ValueError as error:
+        print("bfh: %s" % error, file=sys.stderr)
+        return 1
+    finally:
+        for stream in reversed(streams):
+            stream.close()
+
+    if failed:
+        print("bfh: %d records failed; see %s" % (failed, args.errors),
+              file=sys.stderr)
+    return 0
@@ -5,10 +5,17 @@ Utility functions for BFH
 from __future__ import absolute_import
 
 import re
+import time
+from collections import OrderedDict
 from datetime import timedelta, tzinfo
+from itertools import islice
+
+import six
 
 __all__ = [
     "NULLISH",
+    "LRUCache",
+    "chunked",
     "dedunder",
     "nullish",
     "utc",
@@ -37,6 +44,35 @@ def dedunder(name):
     return name
 
 
+def chunked(iterable, size):
+    """
+    Break an iterable into lists of at most `size` items.
+
+    Consumes the iterable lazily, so it's fine to pass a generator.
+
+    Args:
+        iterable: anything iterable
+        size (int): the most items to put in a chunk
+
+    Returns:
+        iterator of lists
+
+    Raises:
+        ValueError if `size` is less than 1
+    """
+    if size < 1:
+        raise ValueError("chunk size must be at least 1, not %s" % size)
+    return _chunks(iter(iterable), size)
+
+
+def _chunks(iterator, size):
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 # Types that are falsey, but not False itself.
 NULLISH = (None, {}, [], tuple())
 
@@ -55,6 +91,123 @@ def nullish(value, implicit_nulls=True):
     return value is None
 
 
+# stands in for a value that isn't there, where None might be a value
+_MISSING = object()
+
+
+def _same_method(cls, base, *names):
+    """
+    Does `cls` still use the methods of `base` named in `names`?
+
+    The stock behavior of a class is only safe to inline, or skip, if a
+    subclass hasn't overridden it.
+    """
+    for name in names:
+        if (six.get_unbound_function(getattr(cls, name)) is not
+                six.get_unbound_function(getattr(base, name))):
+            return False
+    return True
+
+
+def _class_attribute(cls, name):
+    """
+    Look up an attribute in a class's MRO without invoking descriptors (such
+    as properties, which `_same_method` can't compare).
+
+    """
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            return vars(klass)[name]
+    return None
+
+
+_now = getattr(time, "monotonic", time.time)
+
+
+class LRUCache(object):
+    """
+    A bounded cache that forgets the least recently used items first.
+
+    Counts its hits, misses and evictions so you can tell whether it's
+    earning its keep.
+
+    Args:
+        maxsize (int): the most items to hold
+
+    Kwargs:
+        ttl (float): forget items after this many seconds
+        timer (callable): returns the time in seconds
+    """
+    def __init__(self, maxsize=128, ttl=None, timer=_now):
+        if maxsize < 1:
+            raise ValueError("cache size must be at least 1, not %s" % maxsize)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """
+        Look up a key, counting a hit or a miss.
+
+        Raises:
+            TypeError if the key is unhashable
+        """
+        item = self._items.pop(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+
+        value, expires = item
+        if expires is not None and expires <= self.timer():
+            self.misses += 1
+            return default
+
+        self._items[key] = item  # now the most recently used
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used item if full.
+
+        Raises:
+            TypeError if the key is unhashable
+        """
+        expires = None if self.ttl is None else self.timer() + self.ttl
+        self._items.pop(key, None)
+        self._items[key] = (value, expires)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Forget everything, including the counts.
+
+        """
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self):
+        """
+        Returns:
+            dict of hits, misses, evictions, size and maxsize
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+        }
+
+
 class UTC(tzinfo):
     """
     UTC tzinfo.
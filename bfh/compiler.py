@@ -0,0 +1,671 @@
+"""
+Compile mappings into plain Python functions.
+
+Applying a mapping normally walks its tree of transformations for every
+record, dispatching on every node and isinstance-checking every argument.
+A compiled mapping walks the tree once, when the class is created, and
+generates a single flat function that does the same work in straight-line
+code.
+
+Opt in by setting `compiled` on your mapping::
+
+    class DogToAnimal(Mapping):
+        compiled = True
+
+        name = Get('dogname')
+        legs = Const(4)
+
+Transformations take part in compilation through their `compile` method.
+Any transformation that doesn't know how to compile itself is simply
+called, so custom transformations keep working.
+
+Schemas are compiled too: `compile_serializer` generates a `serialize`
+specialized to the fields of a schema class, and `compile_validator` its
+`validate` (and `errors`).
+
+Compilation also eliminates common subexpressions. Fields that `Get` paths
+with a shared prefix walk the prefix only once per record, and identical
+side-effect-free transformations (see `compile_key`) are evaluated once and
+their value reused.
+"""
+from __future__ import absolute_import
+
+import six
+
+from . import fields
+from .common import (
+    NULLISH,
+    _MISSING,
+    _class_attribute,
+    _same_method,
+    nullish,
+)
+from .exceptions import Invalid
+from .interfaces import SchemaInterface, TransformationInterface
+
+__all__ = [
+    "Compiler",
+    "compile_mapping",
+    "compile_serializer",
+    "compile_column_check",
+    "compile_validator",
+    "value_key",
+]
+
+
+def declared_schema(mapping_class, name):
+    """
+    Look up `source_schema` or `target_schema` on a mapping class.
+
+    Undeclared schemas are properties on the class; treat them as None.
+
+    """
+    schema = getattr(mapping_class, name, None)
+    if isinstance(schema, property):
+        return None
+    return schema
+
+
+def value_key(value):
+    """
+    A hashable key for a transformation argument, for common subexpression
+    elimination.
+
+    Returns:
+        the key, or None if the value can't be shared
+    """
+    if isinstance(value, TransformationInterface):
+        return value.compile_key()
+    try:
+        hash(value)
+    except TypeError:
+        return ("id", id(value))
+    return ("value", type(value), value)
+
+
+class Compiler(object):
+    """
+    Accumulates the source code of a generated function.
+
+    Transformations call back into this to bind constants, allocate
+    temporary variables and emit lines of code.
+
+    Args:
+        name (str): a name for the generated code, used in tracebacks
+    """
+    def __init__(self, name):
+        self.name = name
+        self.namespace = {}
+        self.lines = []
+        self.depth = 1
+        self._constants = {}
+        self._shared = {}
+        self._temps = 0
+
+    def constant(self, value):
+        """
+        Bind a value into the namespace of the generated function.
+
+        Returns:
+            the name the value is bound to
+        """
+        name = self._constants.get(id(value))
+        if name is None:
+            name = "_k%d" % len(self._constants)
+            self._constants[id(value)] = name
+            self.namespace[name] = value
+        return name
+
+    def temp(self):
+        """
+        Allocate a fresh local variable name.
+
+        """
+        name = "_t%d" % self._temps
+        self._temps += 1
+        return name
+
+    def emit(self, line):
+        """
+        Add a line of code at the current indentation.
+
+        """
+        self.lines.append("    " * self.depth + line)
+
+    def indent(self):
+        self.depth += 1
+
+    def dedent(self):
+        self.depth -= 1
+
+    def assign(self, expression):
+        """
+        Assign an expression to a fresh local.
+
+        Returns:
+            name of the local
+        """
+        name = self.temp()
+        self.emit("%s = %s" % (name, expression))
+        return name
+
+    def shared(self, key):
+        """
+        Find a value already computed under `key`.
+
+        Returns:
+            name holding the value, or None
+        """
+        if key is None:
+            return None
+        return self._shared.get(key)
+
+    def share(self, key, name):
+        """
+        Record that `name` holds the value identified by `key`, so later
+        code can reuse it.
+
+        """
+        if key is not None:
+            self._shared[key] = name
+        return name
+
+    def expression(self, value, source):
+        """
+        Compile a transformation argument.
+
+        Transformations emit code, unless an identical transformation has
+        already been compiled; anything else is a constant.
+
+        Returns:
+            name holding the value
+        """
+        if not isinstance(value, TransformationInterface):
+            return self.constant(value)
+
+        key = value.compile_key()
+        if key is not None:
+            key = (source, key)
+        name = self.shared(key)
+        if name is None:
+            name = self.share(key, value.compile(self, source))
+        return name
+
+    def build(self, function_name, args):
+        """
+        Turn the emitted lines into a function.
+
+        Args:
+            function_name (str): name of the generated function
+            args (list of str): its argument names
+
+        Returns:
+            the function, with its code attached as `source`
+        """
+        source = "def %s(%s):\n%s\n" % (
+            function_name, ", ".join(args), "\n".join(self.lines))
+        namespace = dict(self.namespace)
+        code = compile(source, "<bfh: %s>" % self.name, "exec")
+        six.exec_(code, namespace)
+        function = namespace[function_name]
+        function.source = source
+        return function
+
+
+def compile_mapping(mapping_class, target_factory=None, source_factory=None):
+    """
+    Generate a function equivalent to `mapping_class().apply`.
+
+    Args:
+        mapping_class (bfh.Mapping): the mapping to compile
+
+    Kwargs:
+        target_factory (callable): builds the result from the mapped values.
+            If not given, the function returns the mapped values as a dict.
+        source_factory (callable): builds the source from a dict, in place of
+            `source_schema(**blob)`
+
+    Returns:
+        a function taking a single blob
+    """
+    compiler = Compiler(mapping_class.__name__)
+
+    source_schema = declared_schema(mapping_class, "source_schema")
+    if source_schema is None:
+        source = "blob"
+    else:
+        schema = compiler.constant(source_schema)
+        source = "source"
+        compiler.emit("if isinstance(blob, %s):" % schema)
+        compiler.emit("    source = blob")
+        compiler.emit("else:")
+        if source_factory is None:
+            compiler.emit("    source = %s(**blob or {})" % schema)
+        else:
+            compiler.emit("    source = %s(blob or {})" % (
+                compiler.constant(source_factory)))
+
+    results = []
+    for name, transform in mapping_class._fields.items():
+        results.append((name, compiler.expression(transform, source)))
+
+    values = "{%s}" % ", ".join("%r: %s" % (str(name), result)
+                                for name, result in results)
+    if target_factory is None:
+        compiler.emit("return %s" % values)
+    else:
+        compiler.emit("return %s(**%s)" % (
+            compiler.constant(target_factory), values))
+
+    return compiler.build("apply", ["blob"])
+
+
+# values of these types never have a `serialize` method
+_PLAIN_TYPES = frozenset(
+    [bool, float, dict, list, tuple, type(None)] +
+    list(six.integer_types) + list(six.string_types) + [six.text_type])
+
+
+def _inlines_get(schema_class, name, field):
+    """
+    Can reading the field be inlined? Only if it's an ordinary `Field`
+    found in the ordinary way.
+
+    """
+    kind = type(field)
+    return (schema_class.__getattribute__ is object.__getattribute__
+            and _class_attribute(schema_class, name) is field
+            and (_same_method(kind, fields.Field, "__get__") or
+                 (isinstance(field, fields.Subschema)
+                  and _same_method(kind, fields.Subschema, "__get__"))))
+
+
+def _compile_field_value(compiler, schema_class, name, field):
+    """
+    Emit code to read a field's value from `self`.
+
+    Returns:
+        name holding the value
+    """
+    value = compiler.temp()
+    if not _inlines_get(schema_class, name, field):
+        compiler.emit("%s = getattr(self, %r)" % (value, name))
+
+    elif isinstance(field, fields.Subschema):
+        # inline Subschema.__get__
+        missing = compiler.constant(_MISSING)
+        compiler.emit("%s = _d.get(%r, %s)" % (value, name, missing))
+        compiler.emit("if %s is %s:" % (value, missing))
+        compiler.emit("    %s = _d[%r] = %s()" % (
+            value, name, compiler.constant(field.subschema_class)))
+        compiler.emit("elif %s is None:" % value)
+        compiler.emit("    %s = _d[%r] = %s.default" % (
+            value, name, compiler.constant(field)))
+
+    else:
+        # inline Field.__get__
+        compiler.emit("%s = _d.get(%r)" % (value, name))
+        compiler.emit("if %s is None:" % value)
+        compiler.emit("    %s = _d[%r] = %s.default" % (
+            value, name, compiler.constant(field)))
+    return value
+
+
+def _compile_serializable(compiler, value, implicit_nulls):
+    """
+    Emit code to serialize a value if it knows how.
+
+    """
+    compiler.emit("if %s.__class__ not in %s and hasattr(%s, 'serialize'):" % (
+        value, compiler.constant(_PLAIN_TYPES), value))
+    compiler.emit("    %s = %s.serialize(implicit_nulls=%r)" % (
+        value, value, implicit_nulls))
+
+
+def _compile_field_serialize(compiler, field, value, implicit_nulls):
+    """
+    Emit code for `field.serialize(value)`, inlining the stock fields.
+
+    """
+    kind = type(field)
+    if _same_method(kind, fields.Field, "serialize"):
+        pass
+
+    elif (isinstance(field, fields.UnicodeField)
+            and _same_method(kind, fields.UnicodeField, "serialize")
+            and _same_method(kind, fields.UnicodeField, "_coerce")):
+        compiler.emit("if not isinstance(%s, %s):" % (
+            value, compiler.constant(fields.string_type)))
+        compiler.emit("    %s = %s.serialize(%s, implicit_nulls=%r)" % (
+            value, compiler.constant(field), value, implicit_nulls))
+
+    elif ((isinstance(field, fields.Subschema)
+           and _same_method(kind, fields.Subschema, "serialize"))
+          or (isinstance(field, fields.ObjectField)
+              and _same_method(kind, fields.ObjectField, "serialize"))):
+        _compile_serializable(compiler, value, implicit_nulls)
+        compiler.emit("if %s is None:" % value)
+        compiler.emit("    %s = {}" % value)
+        if implicit_nulls:
+            compiler.emit(
+                "elif isinstance(%s, dict) and all(%s(_v) for _v in "
+                "%s.values()):" % (value, compiler.constant(nullish), value))
+            compiler.emit("    %s = {}" % value)
+
+    elif (isinstance(field, fields.ArrayField)
+            and _same_method(kind, fields.ArrayField, "serialize")
+            and _same_method(kind, fields.ArrayField, "_flatten")):
+        items = compiler.temp()
+        compiler.emit("if isinstance(%s, %s):" % (
+            value, compiler.constant(field.field_type)))
+        compiler.indent()
+        compiler.emit("%s = []" % items)
+        compiler.emit("for _i in %s:" % value)
+        compiler.indent()
+        _compile_serializable(compiler, "_i", implicit_nulls)
+        if implicit_nulls:
+            compiler.emit("if not %s(_i):" % compiler.constant(nullish))
+        else:
+            compiler.emit("if _i is not None:")
+        compiler.emit("    %s.append(_i)" % items)
+        compiler.dedent()
+        compiler.emit("%s = %s" % (value, items))
+        compiler.dedent()
+        if field.typecode is not None:
+            compiler.emit("elif %s(%s):" % (
+                compiler.constant(fields._is_typed_array), value))
+            compiler.emit("    %s = %s.tolist()" % (value, value))
+
+    else:
+        compiler.emit("%s = %s.serialize(%s, implicit_nulls=%r)" % (
+            value, compiler.constant(field), value, implicit_nulls))
+
+    _compile_serializable(compiler, value, implicit_nulls)
+
+
+def compile_serializer(schema_class, implicit_nulls=False):
+    """
+    Generate a function equivalent to `schema_class.serialize`, specialized
+    to the schema's fields.
+
+    The stock fields' `serialize` methods are inlined; others are called.
+
+    Args:
+        schema_class (bfh.Schema): the schema to compile
+
+    Kwargs:
+        implicit_nulls (bool): the `implicit_nulls` the function implements
+
+    Returns:
+        a function taking a schema instance, and returning a dict
+    """
+    compiler = Compiler("%s.serialize" % schema_class.__name__)
+    if any(_inlines_get(schema_class, name, schema_class._fields.get(name))
+           for name in schema_class._field_names):
+        compiler.emit("_d = self.__dict__")
+
+    results = []
+    for name in schema_class._field_names:
+        field = schema_class._fields.get(name)
+        value = _compile_field_value(compiler, schema_class, name, field)
+        _compile_field_serialize(compiler, field, value, implicit_nulls)
+        results.append((name, value))
+
+    if not implicit_nulls:
+        compiler.emit("return {%s}" % ", ".join(
+            "%r: %s" % (str(name), value) for name, value in results))
+    else:
+        compiler.emit("out = {}")
+        for name, value in results:
+            # nullish(), but plain values can't have an is_empty
+            compiler.emit(
+                "if not (%s in %s if %s.__class__ in %s else %s(%s)):" % (
+                    value, compiler.constant(NULLISH), value,
+                    compiler.constant(_PLAIN_TYPES),
+                    compiler.constant(nullish), value))
+            compiler.emit("    out[%r] = %s" % (str(name), value))
+        compiler.emit("return out")
+
+    return compiler.build("serialize", ["self"])
+
+
+def _valid_check(compiler, field, value):
+    """
+    An expression that is true if a stock field would certainly find the
+    value valid, so needn't be asked. When it's false, the field is asked,
+    and raises the error it always has.
+
+    Returns:
+        the expression, "True", or None if the field must always be asked
+    """
+    kind = type(field)
+    check = None
+    if _same_method(kind, fields.Field, "validate"):
+        check = "%s is not None" % value
+
+    elif isinstance(field, fields.IsoDateString):
+        if (_same_method(kind, fields.IsoDateString, "validate")
+                and _same_method(kind, fields.UnicodeField, "_coerce")
+                and _same_method(kind, fields.SimpleTypeField, "_valid")):
+            check = "isinstance(%s, %s) and %s(%s)" % (
+                value, compiler.constant(fields.string_type),
+                compiler.constant(field.ISO_REGEX.match), value)
+
+    elif isinstance(field, fields.UnicodeField):
+        if (_same_method(kind, fields.UnicodeField, "validate")
+                and _same_method(kind, fields.UnicodeField, "_coerce")
+                and _same_method(kind, fields.SimpleTypeField, "_valid")):
+            check = "isinstance(%s, %s)" % (
+                value, compiler.constant(fields.string_type))
+
+    elif isinstance(field, fields.ObjectField):
+        if (_same_method(kind, fields.ObjectField, "validate")
+                and _same_method(kind, fields.SimpleTypeField, "_valid")):
+            # a dict has no `validate` of its own to call
+            check = "%s.__class__ is dict" % value
+
+    elif (isinstance(field, fields.SimpleTypeField)
+            and _same_method(kind, fields.SimpleTypeField, "validate")
+            and _same_method(kind, fields.SimpleTypeField, "_valid")):
+        check = "isinstance(%s, %s)" % (
+            value, compiler.constant(field.field_type))
+
+    if check is None or field.required:
+        return check
+    if _same_method(kind, fields.Field, "validate"):
+        return "True"
+    return "%s is None or %s" % (value, check)
+
+
+def _validation_errors(instance, prefix):
+    """
+    The errors of anything that validates its own way, as `Schema.errors`
+    gives them: at most one, as its `validate` stops at the first.
+
+    """
+    try:
+        if instance.validate():
+            return []
+        error = Invalid("%s is not valid" % type(instance).__name__)
+    except Invalid as e:
+        error = e
+    return [(prefix[:-1], error)]
+
+
+def _nested_errors(value, prefix, errors):
+    """
+    Collect the errors of a nested schema (or anything that validates).
+
+    """
+    collect = getattr(value, "_errors", None)
+    if callable(collect):
+        errors.extend(collect(prefix))
+    else:
+        errors.extend(_validation_errors(value, prefix))
+
+
+def _subschema_errors(field, value, path, errors):
+    """
+    Collect errors as `Subschema.validate` would find them.
+
+    """
+    try:
+        fields.Field.validate(field, value)
+    except Invalid as e:
+        errors.append((path, e))
+        return
+
+    if not field.required:
+        if nullish(value) or getattr(value, "is_empty", False):
+            return
+    if not hasattr(value, "validate"):
+        value = field.subschema_class(value)
+    _nested_errors(value, path + ".", errors)
+
+
+def _array_errors(field, items, path, errors):
+    """
+    Collect errors as `ArrayField.validate` would find them, but from every
+    item rather than stopping at the first.
+
+    """
+    if field.typecode is not None and fields._is_typed_array(items):
+        try:
+            field.validate(items)
+        except Invalid as e:
+            errors.append(("%s.0" % path, e))
+        return
+
+    try:
+        fields.SimpleTypeField.validate(field, items)
+    except Invalid as e:
+        errors.append((path, e))
+        return
+
+    if not field.required and items in (None, [], tuple()):
+        return
+
+    if field.is_schema_type:
+        for i, val in enumerate(items):
+            item_path = "%s.%d" % (path, i)
+            if isinstance(val, field.array_type):
+                _nested_errors(val, item_path + ".", errors)
+            elif isinstance(val, SchemaInterface):  # wrong schema
+                errors.append((item_path, Invalid("%s is not a %s" % (
+                    val, field.array_type))))
+            else:
+                _nested_errors(field.array_type(val), item_path + ".", errors)
+
+    elif field.array_type is not None and items is not None:
+        for i, val in enumerate(items):
+            if not isinstance(val, field.array_type):
+                errors.append(("%s.%d" % (path, i), Invalid(
+                    "%s is not a %s" % (val, field.array_type))))
+
+
+def _compile_field_validate(compiler, name, field, value, collect):
+    """
+    Emit code to validate a field's value, skipping the call to the field
+    when an inline check shows the value is valid.
+
+    """
+    kind = type(field)
+    constant = compiler.constant(field)
+    check = _valid_check(compiler, field, value)
+    if check == "True":
+        return
+
+    if collect and (isinstance(field, fields.Subschema)
+                    and _same_method(kind, fields.Subschema, "validate")):
+        compiler.emit("%s(%s, %s, prefix + %r, errors)" % (
+            compiler.constant(_subschema_errors), constant, value, str(name)))
+        return
+
+    if collect and (isinstance(field, fields.ArrayField)
+                    and _same_method(kind, fields.ArrayField, "validate")):
+        compiler.emit("%s(%s, %s, prefix + %r, errors)" % (
+            compiler.constant(_array_errors), constant, value, str(name)))
+        return
+
+    if check is not None:
+        compiler.emit("if not (%s):" % check)
+        compiler.indent()
+
+    if not collect:
+        compiler.emit("if not %s.validate(%s):" % (constant, value))
+        compiler.emit("    ok = False")
+    else:
+        invalid = compiler.constant(Invalid)
+        compiler.emit("try:")
+        compiler.emit("    if not %s.validate(%s):" % (constant, value))
+        compiler.emit("        errors.append((prefix + %r, %s(%r)))" % (
+            str(name), invalid, "%s is not valid" % name))
+        compiler.emit("except %s as e:" % invalid)
+        compiler.emit("    errors.append((prefix + %r, e))" % str(name))
+
+    if check is not None:
+        compiler.dedent()
+
+
+def compile_validator(schema_class, collect=False):
+    """
+    Generate a function equivalent to `schema_class.validate`, specialized
+    to the schema's fields.
+
+    Values that the stock fields' type checks pass are let through inline;
+    fields are only called to check anything else, so raise the errors
+    they always have.
+
+    Args:
+        schema_class (bfh.Schema): the schema to compile
+
+    Kwargs:
+        collect (bool): rather than raising the first error, collect every
+            error, as `Schema.errors` does
+
+    Returns:
+        a function taking a schema instance and returning its validity, or
+        with `collect`, taking a schema instance and a prefix for paths and
+        returning a list of (path, Invalid)
+    """
+    compiler = Compiler("%s.%s" % (schema_class.__name__,
+                                   "errors" if collect else "validate"))
+    names = list(schema_class._fields.items())
+    if any(_inlines_get(schema_class, name, field) for name, field in names):
+        compiler.emit("_d = self.__dict__")
+    compiler.emit("errors = []" if collect else "ok = True")
+
+    for name, field in names:
+        value = _compile_field_value(compiler, schema_class, name, field)
+        _compile_field_validate(compiler, name, field, value, collect)
+
+    if collect:
+        compiler.emit("return errors")
+        return compiler.build("errors", ["self", "prefix"])
+    compiler.emit("return ok")
+    return compiler.build("validate", ["self"])
+
+
+def compile_column_check(field):
+    """
+    Generate a function that checks a column of values for a field at once,
+    with the inline checks of `compile_validator`.
+
+    Args:
+        field (bfh.fields.Field): the field
+
+    Returns:
+        a function taking a list of values, and returning the indexes of
+        those the field must be asked about, or None if it must be asked
+        about every value
+    """
+    compiler = Compiler("%s column" % field.field_name)
+    check = _valid_check(compiler, field, "_v")
+    if check is None:
+        return None
+    if check == "True":
+        compiler.emit("return []")
+    else:
+        compiler.emit("return [_i for _i, _v in enumerate(values) "
+                      "if not (%s)]" % check)
+    return compiler.build("check_column", ["values"])
@@ -0,0 +1,142 @@
+"""
+Apply mappings in parallel, across a pool of worker processes.
+
+`Mapping.apply` is pure Python and CPU-bound, so a single process only ever
+uses a single core. `MappingExecutor` fans blobs out to worker processes in
+chunks::
+
+    with MappingExecutor(MyMapping, processes=32) as executor:
+        for result in executor.map(read_blobs()):
+            ...
+
+The mapping class is sent to each worker once, when the pool starts, so it
+must be importable by the workers (i.e. defined at module level). Blobs and
+results are pickled on their way to and from the workers.
+"""
+from __future__ import absolute_import
+
+import multiprocessing
+import threading
+from functools import partial
+
+from .common import chunked
+
+__all__ = [
+    "MappingExecutor",
+]
+
+
+# the worker's function for applying the mapping; set by `_init_worker`
+_worker_applier = None
+
+
+def _init_worker(mapping_class, serialize, implicit_nulls, function=None):
+    global _worker_applier
+    mapping = mapping_class()
+    if function is not None:
+        _worker_applier = partial(function, mapping)
+    elif serialize:
+        def applier(blob):
+            return mapping.apply_serialized(blob,
+                                            implicit_nulls=implicit_nulls)
+        _worker_applier = applier
+    else:
+        _worker_applier = mapping._applier()
+
+
+def _apply_chunk(chunk):
+    return [_worker_applier(blob) for blob in chunk]
+
+
+class MappingExecutor(object):
+    """
+    Applies a mapping to many blobs using a pool of worker processes.
+
+    Args:
+        mapping_class (bfh.Mapping): the mapping to apply
+
+    Kwargs:
+        processes (int): how many workers; defaults to the number of CPUs
+        chunk_size (int): how many blobs to send to a worker at a time
+        ordered (bool): deliver results in the order of the input. If False,
+            results come back as soon as they are ready.
+        serialize (bool): have the workers serialize the results, returning
+            dicts rather than schema instances. Dicts are cheaper to send
+            back from the workers.
+        implicit_nulls (bool): passed on to `serialize`
+        max_pending (int): how many chunks may be in flight at once;
+            defaults to twice the number of workers. This bounds the memory
+            used, however large the input.
+        function (callable): call this with the mapping instance and each
+            blob, rather than applying the mapping. Like the mapping class,
+            it must be importable by the workers.
+    """
+    def __init__(self, mapping_class, processes=None, chunk_size=100,
+                 ordered=True, serialize=False, implicit_nulls=False,
+                 max_pending=None, function=None):
+        self.mapping_class = mapping_class
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.ordered = ordered
+        self.max_pending = max_pending or 2 * self.processes
+        self._pool = multiprocessing.Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(mapping_class, serialize, implicit_nulls, function),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Shut down the worker processes.
+
+        """
+        self._pool.terminate()
+        self._pool.join()
+
+    def map(self, blobs):
+        """
+        Apply the mapping to each of the blobs.
+
+        The input is consumed lazily, a chunk at a time, as workers become
+        free.
+
+        Args:
+            blobs (iterable): the things to transform
+
+        Returns:
+            iterator of results
+        """
+        slots = threading.BoundedSemaphore(self.max_pending)
+        stopped = []
+
+        def feed():
+            # runs in the pool's task-feeding thread; blocking here is
+            # what stops the pool from reading the whole input at once
+            for chunk in chunked(blobs, self.chunk_size):
+                slots.acquire()
+                if stopped:
+                    return
+                yield chunk
+
+        if self.ordered:
+            results = self._pool.imap(_apply_chunk, feed())
+        else:
+            results = self._pool.imap_unordered(_apply_chunk, feed())
+
+        try:
+            for chunk_results in results:
+                slots.release()
+                for result in chunk_results:
+                    yield result
+        finally:
+            stopped.append(True)
+            try:
+                slots.release()
+            except ValueError:
+                pass
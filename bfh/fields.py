@@ -6,6 +6,7 @@ class so you can implement your own if you want.
 """
 from __future__ import absolute_import
 
+import array
 import re
 from datetime import datetime
 
@@ -33,6 +34,17 @@ __all__ = [
 ]
 
 
+def _unview(value):
+    """
+    Views (see `bfh.schema_view`) are read-only, so a field that takes one
+    takes a schema of its own instead.
+
+    """
+    if getattr(type(value), "_viewed_class", None) is not None:
+        return value._unviewed()
+    return value
+
+
 class Field(FieldInterface):
     """
     Base class for a field.
@@ -125,11 +137,23 @@ class Subschema(Field):
         super(Subschema, self).__init__(*args, **kwargs)
         self.subschema_class = subschema_class
 
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+
+        # a schema that wasn't given a value gets an empty subschema, made
+        # when it is first wanted
+        storage = instance.__dict__
+        if self.field_name not in storage:
+            value = storage[self.field_name] = self.subschema_class()
+            return value
+        return super(Subschema, self).__get__(instance, cls)
+
     def __set__(self, instance, value):
         if isinstance(value, dict):
             instance.__dict__[self.field_name] = self.subschema_class(**value)
         else:
-            instance.__dict__[self.field_name] = value
+            instance.__dict__[self.field_name] = _unview(value)
 
     def serialize(self, value, implicit_nulls=True):
         """
@@ -305,6 +329,18 @@ class ObjectField(SimpleTypeField):
         return value
 
 
+def _is_typed_array(value):
+    """
+    Can only hold values of one type (booleans or numbers)? That is, an
+    `array.array`, or a NumPy array of a bool or number dtype.
+
+    """
+    if isinstance(value, array.array):
+        return True
+    kind = getattr(getattr(value, "dtype", None), "kind", None)
+    return kind is not None and kind in "biuf"
+
+
 class ArrayField(SimpleTypeField):
     """
     A field that can contain an array of things of type `array_type`
@@ -320,22 +356,51 @@ class ArrayField(SimpleTypeField):
 
         {"ints": [1, 2, 3], "inners": [{"wow": 4}, {"wow": 5}]}
 
+    Long arrays of numbers take much less memory as an `array.array`. Give a
+    `typecode` ("d" for floats, or an integer typecode for ints), and lists
+    set on the field are stored that way, provided every item is of the
+    `array_type` and fits:
+
+        class Series(Schema):
+            samples = ArrayField(float, typecode="d")
+
+    The field then also takes an `array.array` or NumPy array as it is.
+    Either is validated by its first item, as every item is of the same
+    type, and serializes as a list. (The list a schema was given is still
+    kept in its `_raw_input`, unless it has `keep_raw_input = False`.)
     """
     field_type = (list, tuple)
 
-    def __init__(self, array_type=None, **kwargs):
+    # the typecodes whose items come back exactly as they went in
+    TYPECODES = {float: "d", int: "bBhHiIlLqQ"}
+
+    def __init__(self, array_type=None, typecode=None, **kwargs):
         """
         Kwargs:
             array_type (type or Schema)
+            typecode (str): store lists as an `array.array` of this typecode
         """
         super(ArrayField, self).__init__(**kwargs)
+        if typecode is not None and not (
+                len(typecode) == 1
+                and typecode in self.TYPECODES.get(array_type, "")):
+            raise ValueError("typecode %r can't hold a %s exactly" % (
+                typecode, array_type))
         self.array_type = array_type
+        self.typecode = typecode
 
     def __set__(self, instance, value):
+        if (self.typecode is not None and value
+                and isinstance(value, self.field_type)
+                and set(map(type, value)) == set([self.array_type])):
+            try:
+                value = array.array(self.typecode, value)
+            except (OverflowError, TypeError):
+                pass  # it doesn't fit, so keep the list
+
         # don't coerce or validate simple Python types here; under the current
         # regime those happen elsewhere. just set the value.
-        if (self.array_type is None
-                or not issubclass(self.array_type, SchemaInterface)
+        if (not self.is_schema_type
                 or not isinstance(value, self.field_type)):
             instance.__dict__[self.field_name] = value
             return
@@ -349,7 +414,7 @@ class ArrayField(SimpleTypeField):
             else:
                 # could already be a Schema instance, or maybe it's not even
                 # valid, but we don't care, we're not validating here
-                result.append(i)
+                result.append(_unview(i))
         instance.__dict__[self.field_name] = result
 
     def _flatten(self, value, implicit_nulls=True):
@@ -359,9 +424,19 @@ class ArrayField(SimpleTypeField):
 
     @property
     def is_schema_type(self):
-        return issubclass(self.array_type, SchemaInterface)
+        return (isinstance(self.array_type, type)
+                and issubclass(self.array_type, SchemaInterface))
 
     def validate(self, items):
+        if self.typecode is not None and _is_typed_array(items):
+            # its items are all of one type, so check the first
+            if self.array_type is not None:
+                for val in items[:1].tolist():
+                    if not isinstance(val, self.array_type):
+                        raise Invalid("%s is not a %s" % (val,
+                                                          self.array_type))
+            return True
+
         # blech... it's not a validation lib. it's not a validation lib.
         super(ArrayField, self).validate(items)
         if not self.required and items in (None, [], tuple()):
@@ -386,6 +461,9 @@ class ArrayField(SimpleTypeField):
         return True
 
     def serialize(self, value, implicit_nulls=True):
+        if self.typecode is not None and _is_typed_array(value):
+            return value.tolist()  # numbers, none of them nullish
+
         if isinstance(value, self.field_type):
             items = []
             for i in value:
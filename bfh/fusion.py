@@ -0,0 +1,282 @@
+"""
+Fuse two mappings into one.
+
+Chaining mappings by hand builds the whole intermediate result between
+them::
+
+    warehouse = CanonicalToWarehouse().apply(
+        VendorToCanonical().apply(vendor_blob))
+
+A fused mapping gives the same result without building it. Each `Get`
+in the second mapping that reads a field of the first is replaced by that
+field's transformation::
+
+    VendorToWarehouse = fuse(VendorToCanonical, CanonicalToWarehouse)
+
+    warehouse = VendorToWarehouse().apply(vendor_blob)
+
+The fused mapping is a `Mapping` like any other, and can itself be fused.
+
+Transformations in the second mapping that need the intermediate result
+as a whole (such as `All`, or custom transformations that read their
+`source`) still get it, built once per blob when first needed. Fields of
+the first mapping that the second doesn't use are never computed, so
+their side effects and errors don't happen.
+"""
+from __future__ import absolute_import
+
+import copy
+import sys
+
+from . import GenericSchema, Mapping, _direct_plan
+from .compiler import declared_schema
+from .instrument import _Timed
+from .interfaces import TransformationInterface
+from .common import _same_method
+from .transformations import Get, Transformation
+
+__all__ = [
+    "FusedMapping",
+    "fuse",
+]
+
+
+class _FusedSource(object):
+    """
+    What a fused mapping transforms: the blob, along with whatever has been
+    worked out about the first mapping's result so far.
+
+    """
+    __slots__ = ("mapping", "blob", "_source", "_values", "_intermediate",
+                 "_second_source")
+
+    def __init__(self, mapping, blob):
+        self.mapping = mapping
+        self.blob = blob
+        self._source = None
+        self._values = {}
+        self._intermediate = None
+        self._second_source = None
+
+    @property
+    def source(self):
+        """
+        The blob, loaded as the first mapping's source.
+
+        """
+        if self._source is None:
+            first = self.mapping._fused_first
+            self._source = first._load_source(self.blob)
+        return self._source
+
+    def value(self, name):
+        """
+        The value the first mapping gives a field.
+
+        """
+        try:
+            return self._values[name]
+        except KeyError:
+            value = self._values[name] = (
+                self.mapping._fused_first._fields[name](self.source))
+            return value
+
+    @property
+    def second_source(self):
+        """
+        The whole result of the first mapping, loaded as the second
+        mapping's source.
+
+        """
+        if self._second_source is None:
+            first = self.mapping._fused_first
+            target_factory = first.target_schema or GenericSchema
+            intermediate = target_factory(**dict(
+                (name, self.value(name)) for name in first._fields))
+            self._second_source = self.mapping._fused_second._load_source(
+                intermediate)
+        return self._second_source
+
+
+class _Reuse(TransformationInterface):
+    """
+    Replaces a `Get` of the second mapping: takes the value from the first
+    mapping's field, then follows the rest of the path.
+
+    """
+    def __init__(self, first, name, read, rest):
+        self.first = first
+        self.name = name
+        self.read = read
+        self.rest = rest
+
+    def __call__(self, source):
+        return self.function(source)
+
+    def function(self, source):
+        value = self.read(source.value(self.name))
+        if self.rest is None:
+            return value
+        return self.rest(value)
+
+    def dependencies(self):
+        return self.first._fields[self.name].dependencies()
+
+
+class _Unfused(TransformationInterface):
+    """
+    Applies a transformation of the second mapping to the whole result of
+    the first.
+
+    """
+    def __init__(self, node):
+        self.node = node
+
+    def __call__(self, source):
+        return self.node(source.second_source)
+
+    def function(self, source, *call_args):
+        return self.node.function(source.second_source, *call_args)
+
+    @property
+    def project(self):
+        node_project = self.node.project
+
+        def project(source, only):
+            return node_project(source.second_source, only)
+        return project
+
+
+class _Holder(object):
+    """
+    Somewhere for a field to store a value.
+
+    """
+
+
+def _field_reader(schema_class, name):
+    """
+    Build a function giving what reading a field back from an instance of
+    `schema_class` would give, after setting it to a value.
+
+    Returns:
+        the function, or None if it can't be done without the instance
+    """
+    if schema_class is None:
+        if hasattr(GenericSchema, name):
+            return None
+        return lambda value: value
+
+    if name not in schema_class._field_names:
+        return None
+    if _direct_plan(schema_class) is None:
+        return None  # customized storage
+
+    field = schema_class._fields[name]
+
+    def read(value):
+        holder = _Holder()
+        field.__set__(holder, value)
+        return field.__get__(holder, schema_class)
+    return read
+
+
+def _fuse_node(node, first):
+    """
+    Rewrite a transformation tree of the second mapping to take a
+    `_FusedSource`.
+
+    """
+    if isinstance(node, _Timed):
+        node = node.node
+
+    if isinstance(node, Get):
+        if (node.path and node.path[0] in first._fields
+                and _same_method(type(node), Get, "__call__", "function",
+                                 "_get", "_get_from_dict", "_get_from_obj")):
+            read = _field_reader(declared_schema(first, "target_schema"),
+                                 node.path[0])
+            if read is not None:
+                default = node.default
+                if default is not None:
+                    field_read = read
+
+                    def read(value):
+                        value = field_read(value)
+                        return default if value is None else value
+
+                rest = None
+                if len(node.path) > 1:
+                    rest = Get(*node.path[1:], **node.kwargs)
+                return _Reuse(first, node.path[0], read, rest)
+        return _Unfused(node)
+
+    if isinstance(node, Transformation) and not node.reads_source:
+        node = copy.copy(node)
+        node.args = tuple(
+            _fuse_node(arg, first)
+            if isinstance(arg, TransformationInterface) else arg
+            for arg in node.args)
+        return node
+
+    return _Unfused(node)
+
+
+class FusedMapping(Mapping):
+    """
+    Base class of the mappings made by `fuse`.
+
+    """
+    #: the mapping applied first, and the mapping applied to its result,
+    #: under names that the second mapping's fields can't take
+    _fused_first = None
+    _fused_second = None
+
+    def _load_source(self, blob):
+        return _FusedSource(self, blob)
+
+
+def fuse(first_class, second_class, name=None):
+    """
+    Compose two mappings into one, equivalent to applying the second to the
+    result of the first.
+
+    Args:
+        first_class (bfh.Mapping): the mapping to apply first
+        second_class (bfh.Mapping): the mapping to apply to its result
+
+    Kwargs:
+        name (str): name of the new class. To pickle the fused mapping (say,
+            to use it with `bfh.executor`), give the name it's assigned to
+            at module level.
+
+    Returns:
+        a new Mapping class
+
+    Raises:
+        ValueError if the second mapping can't take the result of the first
+    """
+    first_target = declared_schema(first_class, "target_schema")
+    second_source = declared_schema(second_class, "source_schema")
+    if second_source is not None and not (
+            first_target is not None
+            and issubclass(first_target, second_source)):
+        raise ValueError("%s gives %s, but %s takes %s" % (
+            first_class.__name__,
+            getattr(first_target, "__name__", "GenericSchema"),
+            second_class.__name__, second_source.__name__))
+
+    first = first_class()
+    attributes = {
+        "_fused_first": first,
+        "_fused_second": second_class(),
+        "__module__": sys._getframe(1).f_globals.get("__name__"),
+    }
+    second_target = declared_schema(second_class, "target_schema")
+    if second_target is not None:
+        attributes["target_schema"] = second_target
+    for field_name, node in second_class._fields.items():
+        attributes[field_name] = _fuse_node(node, first)
+
+    name = name or "%sThen%s" % (first_class.__name__, second_class.__name__)
+    return type(name, (FusedMapping,), attributes)
@@ -0,0 +1,226 @@
+"""
+Measure where the time goes when applying a mapping.
+
+Opt in by setting `instrumented` on your mapping::
+
+    class DogToAnimal(Mapping):
+        instrumented = True
+
+        name = Get('dogname')
+        born = ParseDate(Get('birthday'))
+
+Every node of every field's transformation tree is then timed as the
+mapping is applied, and the numbers collected on the class's `profile`::
+
+    DogToAnimal().apply(dog)
+    print(DogToAnimal.profile.report())
+
+For each node, the profile counts calls, exceptions and None results, and
+keeps the total and the longest time spent in the node (including the time
+spent in the nodes beneath it). Nodes are named by the target field and
+their position below it: `born` is the `ParseDate`, `born.0` is its `Get`.
+
+Mappings that aren't instrumented are not touched, so cost nothing extra.
+Instrumentation defeats the optimizations of compiled mappings, which call
+each instrumented field as an opaque function.
+"""
+from __future__ import absolute_import
+
+import copy
+from collections import OrderedDict
+from timeit import default_timer
+
+from .interfaces import TransformationInterface
+from .transformations import Transformation
+
+__all__ = [
+    "NodeStats",
+    "Profile",
+    "instrument",
+]
+
+
+class NodeStats(object):
+    """
+    What happened in one node of a transformation tree.
+
+    Args:
+        path (str): where the node is, e.g. `"born.0"`
+        kind (str): the node's class name
+    """
+    __slots__ = ("path", "kind", "calls", "total", "max", "errors", "nulls")
+
+    def __init__(self, path, kind):
+        self.path = path
+        self.kind = kind
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.nulls = 0
+
+    @property
+    def mean(self):
+        if not self.calls:
+            return 0.0
+        return self.total / self.calls
+
+    def as_dict(self):
+        return {
+            "path": self.path,
+            "kind": self.kind,
+            "calls": self.calls,
+            "total": self.total,
+            "mean": self.mean,
+            "max": self.max,
+            "errors": self.errors,
+            "nulls": self.nulls,
+        }
+
+
+class Profile(object):
+    """
+    The statistics of an instrumented mapping, by node.
+
+    """
+    def __init__(self):
+        self.nodes = OrderedDict()
+
+    def add(self, path, kind):
+        stats = self.nodes[path] = NodeStats(path, kind)
+        return stats
+
+    def __getitem__(self, path):
+        return self.nodes[path]
+
+    def fields(self):
+        """
+        The statistics of each target field's whole transformation.
+
+        Returns:
+            dict of NodeStats, by field name
+        """
+        return dict((path, stats) for path, stats in self.nodes.items()
+                    if "." not in path)
+
+    def slowest(self, count=10):
+        """
+        Returns:
+            list of the `count` nodes with the most total time
+        """
+        return sorted(self.nodes.values(), key=lambda s: s.total,
+                      reverse=True)[:count]
+
+    def reset(self):
+        """
+        Zero all the statistics.
+
+        """
+        for stats in self.nodes.values():
+            stats.reset()
+
+    def as_dict(self):
+        """
+        Returns:
+            the statistics, as a dict (suitable for JSON) keyed by path
+        """
+        return dict((path, stats.as_dict())
+                    for path, stats in self.nodes.items())
+
+    def report(self, sort="total"):
+        """
+        Format the statistics as a table.
+
+        Kwargs:
+            sort (str): the column to sort by, from `path`, `calls`,
+                `total`, `mean`, `max`, `errors` or `nulls`
+
+        Returns:
+            str
+        """
+        rows = sorted(self.nodes.values(), key=lambda s: getattr(s, sort),
+                      reverse=sort != "path")
+        width = max([len("node")] + [len(s.path) for s in rows])
+        kind_width = max([len("kind")] + [len(s.kind) for s in rows])
+        line = "%%-%ds  %%-%ds  %%8s  %%10s  %%10s  %%10s  %%6s  %%6s" % (
+            width, kind_width)
+        lines = [line % ("node", "kind", "calls", "total (s)", "mean (s)",
+                         "max (s)", "errors", "nulls")]
+        for s in rows:
+            lines.append(line % (
+                s.path, s.kind, s.calls, "%.6f" % s.total, "%.6f" % s.mean,
+                "%.6f" % s.max, s.errors, s.nulls))
+        return "\n".join(lines)
+
+
+class _Timed(TransformationInterface):
+    """
+    Wraps a node of a transformation tree, recording its calls.
+
+    """
+    def __init__(self, node, stats):
+        self.node = node
+        self.stats = stats
+
+    def __call__(self, source=None):
+        return self._timed(self.node, source)
+
+    def function(self, source, *call_args):
+        return self.node.function(source, *call_args)
+
+    def dependencies(self):
+        return self.node.dependencies()
+
+    @property
+    def project(self):
+        # only Submappings can be projected; hide the method otherwise
+        node_project = self.node.project
+
+        def project(source, only):
+            return self._timed(node_project, source, only)
+        return project
+
+    def _timed(self, call, *args):
+        stats = self.stats
+        start = default_timer()
+        try:
+            result = call(*args)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = default_timer() - start
+            stats.calls += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+        if result is None:
+            stats.nulls += 1
+        return result
+
+
+def instrument(node, profile, path):
+    """
+    Build a copy of a transformation tree that records its calls.
+
+    The original tree is left alone.
+
+    Args:
+        node (TransformationInterface): root of the tree
+        profile (Profile): where to record the statistics
+        path (str): name of the root node
+
+    Returns:
+        the instrumented tree
+    """
+    stats = profile.add(path, type(node).__name__)
+    if isinstance(node, Transformation) and node.args:
+        node = copy.copy(node)
+        node.args = tuple(
+            instrument(arg, profile, "%s.%d" % (path, i))
+            if isinstance(arg, TransformationInterface) else arg
+            for i, arg in enumerate(node.args))
+    return _Timed(node, stats)
@@ -51,29 +51,229 @@ class TransformationInterface(object):
 
         """
 
+    def compile(self, compiler, source):
+        """
+        Emit code for this transformation into a compiled mapping.
+
+        The default just calls the transformation; subclasses may do
+        better by emitting straight-line code.
+
+        Args:
+            compiler (bfh.compiler.Compiler): the function being built
+            source (str): name of the variable holding the source object
+
+        Returns:
+            name of the variable holding the result
+        """
+        return compiler.assign("%s(%s)" % (compiler.constant(self), source))
+
+    def compile_key(self):
+        """
+        A hashable key identifying what this transformation computes.
+
+        Transformations with equal keys, applied to the same source, give the
+        same result, so compiled code need only evaluate them once. The
+        default, None, means never share.
+
+        """
+        return None
+
+    def dependencies(self):
+        """
+        The paths into the source object that this transformation reads.
+
+        A path is a tuple of names, as passed to `Get`. The default, None,
+        means the transformation may depend on anything in the source.
+
+        Returns:
+            frozenset of paths, or None
+        """
+        return None
+
+
+class _SlotDict(object):
+    """
+    Stands in for the `__dict__` of a compact instance, so fields can store
+    their values in its slots as they would in a dict.
+
+    """
+    __slots__ = ("instance", "members")
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.members = type(instance)._slot_members
+
+    def __getitem__(self, name):
+        try:
+            return self.members[name].__get__(self.instance)
+        except AttributeError:
+            raise KeyError(name)
+
+    def __setitem__(self, name, value):
+        self.members[name].__set__(self.instance, value)
+
+    def __contains__(self, name):
+        return self.get(name, self) is not self
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, name, default=None):
+        member = self.members.get(name)
+        if member is None:
+            return default
+        try:
+            return member.__get__(self.instance)
+        except AttributeError:
+            return default
+
+    def keys(self):
+        return [name for name in self.members if name in self]
+
+    def values(self):
+        return [self[name] for name in self.keys()]
+
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
+
+
+def _slot_dict(instance):
+    return _SlotDict(instance)
+
+
+def _getstate(instance):
+    return dict(_SlotDict(instance).items())
+
+
+def _setstate(instance, state):
+    storage = _SlotDict(instance)
+    for name, value in state.items():
+        storage[name] = value
+
+
+def _compact(classname, bases, attributes):
+    """
+    Lay out a compact class: its fields' values, and `_raw_input` if it is
+    kept, are stored in slots rather than in a per-instance dict.
+
+    Returns:
+        the class attributes, with `__slots__` and friends added
+    """
+    for base in bases:
+        for cls in base.__mro__[:-1]:
+            if "__slots__" not in vars(cls):
+                raise TypeError(
+                    "%s can't be compact: its base %s isn't" % (
+                        classname, cls.__name__))
+
+    inherited = {}
+    for base in reversed(bases):
+        inherited.update(getattr(base, "_slot_members", {}))
+
+    slots = list(attributes.get("__slots__", ()))
+    if not any(getattr(base, "compact", False) is True for base in bases):
+        # where the first compact class caches its `_raw`
+        slots.append("_raw_cache")
+    names = {}
+    for name, attribute in attributes.items():
+        if isinstance(attribute, FieldInterface):
+            field_name = dedunder(name)
+            if field_name in inherited:
+                continue
+            if field_name == name:
+                # the field itself is in the way
+                names[field_name] = "_value_" + field_name
+            else:
+                # private fields are set under their dedundered name,
+                # without going through the field
+                names[field_name] = field_name
+
+    keep_raw_input = attributes.get("keep_raw_input")
+    for base in bases:
+        if keep_raw_input is None:
+            keep_raw_input = getattr(base, "keep_raw_input", None)
+    if keep_raw_input and "_raw_input" not in inherited:
+        names["_raw_input"] = "_raw_input"
+
+    attributes = dict(attributes)
+    attributes["__slots__"] = tuple(slots + sorted(names.values()))
+    attributes.setdefault("__dict__", property(_slot_dict))
+    attributes.setdefault("__getstate__", _getstate)
+    attributes.setdefault("__setstate__", _setstate)
+    return attributes, inherited, names
+
+
+# attributes bfh sets on schema instances, which are never dedundered
+_INTERNAL_NAMES = dict((name, name) for name in (
+    "_raw_input", "_pending", "_lazy_source"))
+
 
 class HasFieldsMeta(ABCMeta):
     """
     Metaclass for classes that may have fields.
 
+    Classes with `compact = True` keep their fields' values in slots rather
+    than in a per-instance dict, which takes much less memory. Every base
+    of a compact class must have `__slots__` (or be compact), and instances
+    can't be given attributes that aren't fields.
     """
     def __new__(metaclass, classname, bases, attributes, *args, **kwargs):
+        compact = attributes.get(
+            "compact", any(getattr(base, "compact", False) is True
+                           for base in bases))
+        if compact is True:
+            attributes, slot_members, slot_names = _compact(
+                classname, bases, attributes)
+
         new_class = super(HasFieldsMeta, metaclass).__new__(
             metaclass, classname, bases, attributes, *args, **kwargs
         )
+
+        if compact is True:
+            for name, slot in slot_names.items():
+                slot_members[name] = vars(new_class)[slot]
+            new_class._slot_members = slot_members
+
         setattr(new_class, '_fields', {})
         setattr(new_class, '_field_names', [])
+        setattr(new_class, '_attribute_names', dict(_INTERNAL_NAMES))
+        setattr(new_class, '_kwarg_names', {})
         for name in dir(new_class):
             attribute = getattr(new_class, name)
             if not isinstance(attribute,
                               (FieldInterface, TransformationInterface)):
                 continue
-            name = dedunder(name)
-            new_class._fields[name] = attribute
-            new_class._field_names.append(name)
-            attribute.field_name = name
+            field_name = dedunder(name)
+            new_class._fields[field_name] = attribute
+            new_class._field_names.append(field_name)
+            attribute.field_name = field_name
+            new_class._name_field(name, field_name)
+
+        prepare = getattr(new_class, '_prepare_class', None)
+        if prepare is not None:
+            prepare()
         return new_class
 
+    def _name_field(cls, attribute_name, field_name):
+        """
+        Record the names a field goes by, so they needn't be worked out
+        again each time an attribute is set.
+
+        `_attribute_names` maps the names attributes may be set by, plain or
+        privacy-mangled (`_Foo__name`), to the field's name, as `dedunder`
+        would. `_kwarg_names` does the same for the keyword arguments a
+        schema takes, plain or dunder (`__name`).
+        """
+        cls._attribute_names[attribute_name] = field_name
+        cls._attribute_names[field_name] = field_name
+        cls._kwarg_names[field_name] = field_name
+        if field_name.strip("_") == field_name:
+            cls._kwarg_names["__" + field_name] = field_name
+            cls._kwarg_names["__%s__" % field_name] = field_name
+
 
 @add_metaclass(HasFieldsMeta)
 class SchemaInterface(object):
@@ -81,6 +281,8 @@ class SchemaInterface(object):
     Interface for a Schema class.
 
     """
+    __slots__ = ()
+
     @abstractmethod
     def validate(self):
         """
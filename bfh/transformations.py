@@ -24,14 +24,17 @@ filter and munge that object into the form of the output schema.
 """
 from __future__ import absolute_import
 
+import re
 from datetime import datetime
 
 from dateutil.parser import parse as parse_date
+from dateutil.tz import tzoffset, tzutc
 import six
 
 from itertools import chain
 
-from .common import utc
+from .common import _MISSING, _same_method, LRUCache, utc
+from .compiler import value_key
 from .exceptions import Missing
 from .interfaces import TransformationInterface
 
@@ -112,10 +115,70 @@ class Get(TransformationInterface):
         self.kwargs = kwargs
         self.required = kwargs.get('required', False)
         self.default = kwargs.get('default')
+        self._access = self._accessor()
 
     def __call__(self, source):
         return self.function(source)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_access"]  # a closure; it's built again on unpickling
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._access = self._accessor()
+
+    def _accessor(self):
+        """
+        Build a function that follows the whole path in one go.
+
+        It does what `_get` does at each step, but loops instead of recursing
+        and checks for a plain dict before anything else.
+
+        Returns:
+            the function, or None if a subclass changes how we get things
+        """
+        if not self.path or not _same_method(
+                type(self), Get, "_get", "_get_from_dict", "_get_from_obj"):
+            return None
+
+        path, default = self.path, self.default
+
+        if self.required:
+            def access(source):
+                try:
+                    for name in path:
+                        if isinstance(source, dict):
+                            source = source[name]
+                        else:
+                            source = getattr(source, name)
+                except (KeyError, AttributeError) as e:
+                    raise Missing(e)
+                return source
+
+        elif default is None:
+            def access(source):
+                for name in path:
+                    if isinstance(source, dict):
+                        source = source.get(name)
+                    else:
+                        source = getattr(source, name, None)
+                return source
+
+        else:
+            def access(source):
+                for name in path:
+                    if isinstance(source, dict):
+                        source = source.get(name)
+                    else:
+                        source = getattr(source, name, None)
+                    if source is None:
+                        source = default
+                return source
+
+        return access
+
     def _get_from_dict(self, source, path):
         if not self.required:
             val = source.get(path)
@@ -141,6 +204,9 @@ class Get(TransformationInterface):
             raise Missing(e)
 
     def function(self, source, path=None):
+        if path is None and self._access is not None:
+            return self._access(source)
+
         parts = path or self.path
         first, rest = parts[0], parts[1:]
         got = self._get(source, first)
@@ -148,6 +214,51 @@ class Get(TransformationInterface):
             return self.function(got, rest)
         return got
 
+    def compile(self, compiler, source):
+        if self.compile_key() is None:
+            return super(Get, self).compile(compiler, source)
+
+        value = source
+        for name in self.path:
+            key = (value, value_key(name), self.required,
+                   value_key(self.default))
+            value = (compiler.shared(key) or
+                     compiler.share(key, self._compile_hop(
+                         compiler, value, compiler.constant(name))))
+        return value
+
+    def compile_key(self):
+        if not self.path or not _same_method(
+                type(self), Get, "__call__", "function", "_get",
+                "_get_from_dict", "_get_from_obj"):
+            return None
+        return (Get, self.path, self.required, value_key(self.default))
+
+    def dependencies(self):
+        if not self.path:
+            return None
+        return frozenset([self.path])
+
+    def _compile_hop(self, compiler, value, name):
+        result = compiler.temp()
+        if self.required:
+            compiler.emit("try:")
+            compiler.emit("    %s = %s[%s] if isinstance(%s, dict) "
+                          "else getattr(%s, %s)" % (
+                              result, value, name, value, value, name))
+            compiler.emit("except (KeyError, AttributeError) as e:")
+            compiler.emit("    raise %s(e)" % compiler.constant(Missing))
+            return result
+
+        compiler.emit("%s = %s.get(%s) if isinstance(%s, dict) "
+                      "else getattr(%s, %s, None)" % (
+                          result, value, name, value, value, name))
+        if self.default is not None:
+            compiler.emit("if %s is None:" % result)
+            compiler.emit("    %s = %s" % (
+                result, compiler.constant(self.default)))
+        return result
+
 
 class Transformation(TransformationInterface):
     """
@@ -159,6 +270,16 @@ class Transformation(TransformationInterface):
     Args:
         required (bool, default False): error if names missing
     """
+    #: Does the transformation always give the same result for the same
+    #: input, without side effects? If so, compiled mappings may evaluate
+    #: identical copies of it only once.
+    pure = False
+
+    #: Does `function` look at the `source` it is passed, rather than only
+    #: at the values of the arguments? If so, the transformation may depend
+    #: on anything in the source (see `dependencies`).
+    reads_source = True
+
     def __init__(self, *args, **kwargs):
         self.args = args
         self.kwargs = kwargs
@@ -177,6 +298,41 @@ class Transformation(TransformationInterface):
 
         return self.function(source, *call_args)
 
+    def compile(self, compiler, source):
+        if not _same_method(type(self), Transformation, "__call__"):
+            return super(Transformation, self).compile(compiler, source)
+
+        call_args = self._compile_args(compiler, source)
+        return compiler.assign("%s(%s)" % (
+            compiler.constant(self.function), ", ".join([source] + call_args)))
+
+    def compile_key(self):
+        if not self.pure or not _same_method(type(self), Transformation,
+                                             "__call__"):
+            return None
+
+        keys = [value_key(arg) for arg in self.args]
+        keys.extend(value_key(v) for k, v in sorted(self.kwargs.items()))
+        if None in keys:
+            return None
+        return (type(self), tuple(keys), tuple(sorted(self.kwargs)))
+
+    def _compile_args(self, compiler, source):
+        return [compiler.expression(arg, source) for arg in self.args]
+
+    def dependencies(self):
+        if self.reads_source:
+            return None
+
+        paths = set()
+        for arg in self.args:
+            if isinstance(arg, TransformationInterface):
+                arg_paths = arg.dependencies()
+                if arg_paths is None:
+                    return None
+                paths.update(arg_paths)
+        return frozenset(paths)
+
 
 class Submapping(Transformation):
     """
@@ -188,12 +344,71 @@ class Submapping(Transformation):
     Returns:
         result of applying submapping to the input
     """
+    reads_source = False
+
     def __init__(self, submapping_class, *args):
         self.submapping_class = submapping_class
         self.args = args
 
+    @property
+    def submapping(self):
+        """
+        An instance of the submapping class.
+
+        Mappings are stateless, so one instance is shared by every call.
+        """
+        submapping = getattr(self, "_submapping", None)
+        if submapping is None:
+            submapping = self._submapping = self.submapping_class()
+        return submapping
+
+    @property
+    def submapping_applier(self):
+        """
+        The submapping's `apply`, with its per-class lookups done once.
+
+        """
+        applier = getattr(self, "_submapping_applier", None)
+        if applier is None:
+            applier = self._submapping_applier = self.submapping._applier()
+        return applier
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # made again when next needed
+        state.pop("_submapping", None)
+        state.pop("_submapping_applier", None)
+        return state
+
     def function(self, source, *call_args):  # source ignored
-        return self.submapping_class().apply(call_args[0])
+        return self.submapping.apply(call_args[0])
+
+    def project(self, source, only):
+        """
+        Transform the source, mapping only some of the submapping's fields.
+
+        Args:
+            source: the object being mapped
+            only (list of str): the submapping's fields to map
+
+        Returns:
+            result of applying submapping to the input
+        """
+        call_args = self._call_args(source)
+        return self.submapping.apply(call_args[0], only=only)
+
+    def _call_args(self, source):
+        return [arg(source) if isinstance(arg, TransformationInterface)
+                else arg for arg in self.args]
+
+    def compile(self, compiler, source):
+        if not self.args or not _same_method(type(self), Submapping,
+                                             "__call__", "function"):
+            return super(Submapping, self).compile(compiler, source)
+
+        call_args = self._compile_args(compiler, source)
+        return compiler.assign("%s(%s)" % (
+            compiler.constant(self.submapping_applier), call_args[0]))
 
 
 def _many_items(call_args, drop_nones=True):
@@ -225,8 +440,23 @@ class ManySubmap(Submapping):
         results of applying submapping to each item in the input
     """
     def function(self, source, *call_args):  # source ignored
-        return [self.submapping_class().apply(item)
-                for item in _many_items(call_args)]
+        apply_one = self.submapping_applier
+        return [apply_one(item) for item in _many_items(call_args)]
+
+    def project(self, source, only):
+        apply_one = self.submapping._applier(only=only)
+        return [apply_one(item)
+                for item in _many_items(self._call_args(source))]
+
+    def compile(self, compiler, source):
+        if not _same_method(type(self), ManySubmap, "__call__", "function"):
+            return super(Submapping, self).compile(compiler, source)
+
+        call_args = self._compile_args(compiler, source)
+        return compiler.assign("[%s(_i) for _i in %s([%s])]" % (
+            compiler.constant(self.submapping_applier),
+            compiler.constant(_many_items),
+            ", ".join(call_args)))
 
 
 class Many(Transformation):
@@ -240,6 +470,8 @@ class Many(Transformation):
     Returns:
         results of applying subtransformation to each item in the input
     """
+    reads_source = False
+
     def __init__(self, subtrans, *args, **kwargs):
         self.subtrans = subtrans  # Transformation
         self.args = args
@@ -258,15 +490,27 @@ class Const(Transformation):
     Return a constant value.
 
     """
+    pure = True
+    reads_source = False
+
     def function(self, source, *call_args):  # source ignored
         return call_args[0]
 
+    def compile(self, compiler, source):
+        if not self.args or not _same_method(type(self), Const, "__call__",
+                                             "function"):
+            return super(Const, self).compile(compiler, source)
+
+        return self._compile_args(compiler, source)[0]
+
 
 class CoerceType(Transformation):
     """
     A base class for transformations that use basic Python type coercion
 
     """
+    pure = True
+    reads_source = False
 
     null_types = (None,)
 
@@ -280,6 +524,18 @@ class CoerceType(Transformation):
             return value
         return self.target_type(value)
 
+    def compile(self, compiler, source):
+        if not self.args or not _same_method(type(self), CoerceType,
+                                             "__call__", "function"):
+            return super(CoerceType, self).compile(compiler, source)
+
+        value = self._compile_args(compiler, source)[0]
+        coerce = "%s(%s)" % (compiler.constant(self.target_type), value)
+        if self.required:
+            return compiler.assign(coerce)
+        return compiler.assign("%s if %s in %s else %s" % (
+            value, value, compiler.constant(self.null_types), coerce))
+
 
 class Int(CoerceType):
     """
@@ -323,6 +579,9 @@ class Concat(Transformation):
         *args: strings to concatenate
         strict (bool, default False): if not strict, ignore None
     """
+    pure = True
+    reads_source = False
+
     def __init__(self, *args, **kwargs):
         super(Concat, self).__init__(*args, **kwargs)
         self.strict = kwargs.get('strict', False)
@@ -332,6 +591,16 @@ class Concat(Transformation):
             call_args = [i for i in call_args if i]
         return "".join(call_args)
 
+    def compile(self, compiler, source):
+        if not _same_method(type(self), Concat, "__call__", "function"):
+            return super(Concat, self).compile(compiler, source)
+
+        call_args = ", ".join(self._compile_args(compiler, source))
+        if self.strict:
+            return compiler.assign('"".join([%s])' % call_args)
+        return compiler.assign('"".join([_i for _i in [%s] if _i])' %
+                               call_args)
+
 
 class Do(Transformation):
     """
@@ -345,43 +614,192 @@ class Do(Transformation):
         MyMapping().apply({'value': 2}).serialize()
         # {'squared': 4}
 
+    If the callable is expensive and sees the same inputs over and over,
+    cache its results::
+
+        class MyMapping(Mapping):
+            country = Do(lookup_country, Get('code'), cache=1000)
+
+        MyMapping.country.cache_info()
+        # {'hits': 0, 'misses': 0, 'evictions': 0, 'unhashable': 0, ...}
+
+    Cached results are shared between records, so don't mutate them.
+
     Args:
         *args: the first positional arg to the constructor should be a
             callable. this callable is applied to the input generated by any
             transformations passed in the subsequent args
+        cache (int): remember the results for this many distinct inputs.
+            Inputs that can't be hashed are never cached.
+        ttl (float): with `cache`, forget results after this many seconds
     """
+    reads_source = False
+
+    def __init__(self, *args, **kwargs):
+        super(Do, self).__init__(*args, **kwargs)
+        cache = kwargs.get("cache")
+        if cache:
+            self.cache = LRUCache(cache, ttl=kwargs.get("ttl"))
+        else:
+            self.cache = None
+        self.unhashable = 0
+
     def function(self, source, *call_args):  # source ignored
+        if self.cache is not None:
+            return self._cached(call_args)
         return call_args[0](*call_args[1:])
 
+    def _cached(self, call_args):
+        cache = self.cache
+        # 1, 1.0 and True are equal, but mayn't give the same result
+        key = call_args + tuple(map(type, call_args))
+        try:
+            result = cache.get(key, _MISSING)
+        except TypeError:
+            self.unhashable += 1
+            return call_args[0](*call_args[1:])
+
+        if result is _MISSING:
+            result = call_args[0](*call_args[1:])
+            cache.set(key, result)
+        return result
+
+    def cache_info(self):
+        """
+        How well is the cache doing?
+
+        Returns:
+            dict of hits, misses, evictions, unhashable (calls that
+            couldn't be cached), size and maxsize; or None if not caching.
+        """
+        if self.cache is None:
+            return None
+        info = self.cache.info()
+        info["unhashable"] = self.unhashable
+        return info
+
+    def compile(self, compiler, source):
+        if (not self.args or self.cache is not None
+                or not _same_method(type(self), Do, "__call__", "function")):
+            return super(Do, self).compile(compiler, source)
+
+        call_args = self._compile_args(compiler, source)
+        return compiler.assign("%s(%s)" % (
+            call_args[0], ", ".join(call_args[1:])))
+
 
 class Chain(Transformation):
     """
     Chain a list of iterables into a single list.
 
     """
+    reads_source = False
+
     def function(self, source, *call_args):
         return list(chain(*call_args))
 
 
+ISO_8601 = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?"
+    r"(Z|[+-]\d{2}(?::?\d{2})?)?)?\Z"
+)
+
+_UTC = tzutc()
+
+
+def _parse_iso_8601(value):
+    """
+    Parse the strict, common forms of ISO 8601 (and so RFC 3339) dates:
+
+        2016-01-02
+        2016-01-02T03:04
+        2016-01-02T03:04:05.678Z
+        2016-01-02 03:04:05+01:00
+
+    Gives the same result as dateutil, which is very much slower.
+
+    Returns:
+        datetime, or None if the string isn't in one of these forms
+    """
+    match = ISO_8601.match(value)
+    if match is None:
+        return None
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    if not offset:
+        tzinfo = None
+    elif offset == "Z":
+        tzinfo = _UTC
+    else:
+        digits = offset[1:].replace(":", "")
+        seconds = int(digits[:2]) * 3600 + int(digits[2:] or 0) * 60
+        if seconds >= 24 * 3600:  # out of range; let dateutil decide
+            return None
+        if offset[0] == "-":
+            seconds = -seconds
+        tzinfo = tzoffset(None, seconds) if seconds else _UTC
+
+    try:
+        return datetime(int(year), int(month), int(day),
+                        int(hour or 0), int(minute or 0), int(second or 0),
+                        int((fraction or "0").ljust(6, "0")), tzinfo)
+    except ValueError:  # out of range; let dateutil decide what to do
+        return None
+
+
 class ParseDate(Transformation):
     """
     Parse a date-ish string into a datetime object.
 
+    Strict ISO 8601 strings are parsed quickly; anything else is handed to
+    dateutil, which understands almost anything but is slow about it.
+
     Args:
         tz (tzinfo): the time zone to assume if none supplied
+        cache (int): remember the results for this many distinct strings.
+            Handy when many records share timestamps.
     """
+    pure = True
+    reads_source = False
+
     DEFAULT_TIMEZONE = utc
 
+    def __init__(self, *args, **kwargs):
+        super(ParseDate, self).__init__(*args, **kwargs)
+        cache = kwargs.get("cache")
+        self.cache = LRUCache(cache) if cache else None
+
     @property
     def tz(self):
         return self.kwargs.get("tz", self.DEFAULT_TIMEZONE)
 
     def function(self, source, *call_args):  # source ignored
         value = call_args[0]
+        if self.cache is None or not isinstance(value, six.string_types):
+            return self._parse(value)
+
+        date = self.cache.get(value)
+        if date is None:
+            date = self._parse(value)
+            self.cache.set(value, date)
+        return date
+
+    def cache_info(self):
+        """
+        Returns:
+            dict of cache hits, misses, evictions, size and maxsize; or None
+            if not caching.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.info()
+
+    def _parse(self, value):
         if isinstance(value, int):
             date = datetime.utcfromtimestamp(value)
         elif isinstance(value, six.string_types):
-            date = parse_date(value)
+            date = _parse_iso_8601(value) or parse_date(value)
         else:
             raise TypeError("Could not parse %s" % value)
 
@@ -396,6 +814,9 @@ class DateToIsoString(Transformation):
     Turn a datetime into an ISO 8601 formatted string.
 
     """
+    pure = True
+    reads_source = False
+
     null_types = (None,)
 
     def function(self, source, *call_args):  # source ignored
@@ -21,4 +21,9 @@ setup(
         "Programming Language :: Python :: 2.7",
     ],
     packages=["bfh"],
+    entry_points={
+        "console_scripts": [
+            "bfh = bfh.cli:main",
+        ],
+    },
 )
@@ -0,0 +1,116 @@
+import array
+from unittest import TestCase
+
+from bfh import Schema
+from bfh.batch import validate_batch
+from bfh.exceptions import Invalid
+from bfh.fields import (
+    ArrayField,
+    BooleanField,
+    IntegerField,
+    IsoDateString,
+    NumberField,
+    ObjectField,
+    Subschema,
+    UnicodeField,
+)
+
+
+class Sample(Schema):
+    value = NumberField()
+    ok = BooleanField(required=False)
+
+
+class Probe(Schema):
+    name = UnicodeField()
+    serial = IntegerField()
+    when = IsoDateString(required=False)
+    meta = ObjectField(required=False)
+    latest = Subschema(Sample)
+    spare = Subschema(Sample, required=False)
+    samples = ArrayField(Sample, required=False)
+    __class = UnicodeField(required=False)
+
+
+class Finicky(Probe):
+    def validate(self):
+        super(Finicky, self).validate()
+        return self.serial != 13
+
+
+def one_at_a_time(schema_class, records):
+    mask = []
+    for record in records:
+        try:
+            mask.append(not schema_class(**record).validate())
+        except Invalid:
+            mask.append(True)
+    return mask
+
+
+class TestValidateBatch(TestCase):
+    def setUp(self):
+        good = {"name": u"p", "serial": 1, "latest": {"value": 1.5},
+                "__class": u"c"}
+        self.records = [
+            good,
+            dict(good, when=u"2017-01-01T00:00:00", meta={"a": 1},
+                 spare={"value": 2.0, "ok": True},
+                 samples=[{"value": 0.5}], __class=u"c"),
+            dict(good, name=None),
+            dict(good, name=b"bytes"),
+            dict(good, serial=u"1"),
+            dict(good, serial=13),
+            dict(good, when=u"soon"),
+            dict(good, meta=[1]),
+            dict(good, latest={"value": 1}),
+            dict(good, latest={}),
+            dict(good, latest=None),
+            {"name": u"p", "serial": 1, "__class": None},
+            dict(good, spare={}),
+            dict(good, spare={"value": None}),
+            dict(good, spare={"value": 2.0, "ok": u"yes"}),
+            dict(good, samples=[{"value": u"0.5"}]),
+            dict(good, samples=[{"value": 0.5}, {"value": u"0.5"}]),
+            dict(good, samples=[Sample(value=1)]),
+            dict(good, samples=[Probe()]),
+            dict(good, __class=5),
+            dict(good, **{"__class__": 5, "__class": None}),
+        ]
+
+    def test_same_as_one_at_a_time(self):
+        for schema_class in (Probe, Finicky):
+            self.assertEqual(one_at_a_time(schema_class, self.records),
+                             validate_batch(schema_class, self.records))
+
+    def test_columns(self):
+        columns = {
+            "name": [u"a", u"b", None],
+            "serial": array.array("l", [1, 2, 3]),
+            "latest": [{"value": 1.0}, {"value": 2}, {"value": 3.0}],
+            "__class": [u"x", 5, u"z"],
+        }
+        self.assertEqual([False, True, True],
+                         validate_batch(Probe, columns))
+
+        floats = {"value": array.array("d", [1.0, 2.0])}
+        self.assertEqual([False, False], validate_batch(Sample, floats))
+        ints = {"value": array.array("l", [1, 2])}
+        self.assertEqual([True, True], validate_batch(Sample, ints))
+
+        with self.assertRaises(ValueError):
+            validate_batch(Sample, {"value": [1.0], "ok": [True, False]})
+        self.assertEqual([], validate_batch(Sample, {}))
+        self.assertEqual([], validate_batch(Sample, []))
+
+    def test_numpy_columns(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy isn't installed")
+
+        columns = {"value": numpy.array([1.0, 2.0]),
+                   "ok": numpy.array([True, False])}
+        self.assertEqual([False, False], validate_batch(Sample, columns))
+        columns["value"] = numpy.array([1, 2])
+        self.assertEqual([True, True], validate_batch(Sample, columns))
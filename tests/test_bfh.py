@@ -1,8 +1,10 @@
 from unittest import TestCase
 
+import copy
 import math
+import pickle
 
-from bfh import Schema, Mapping, GenericSchema
+from bfh import Schema, Mapping, GenericSchema, schema_view
 from bfh.exceptions import Invalid
 from bfh.fields import (
     ArrayField,
@@ -12,12 +14,15 @@ from bfh.fields import (
     UnicodeField
 )
 from bfh.transformations import (
+    All,
     Const,
     Concat,
     Do,
     Get,
     Int,
+    ManySubmap,
     Str,
+    Submapping,
 )
 
 
@@ -54,6 +59,14 @@ class Conversation(Schema):
 
 
 class TestSchemas(TestCase):
+    def test_bare_schema(self):
+        s = Schema(a=1)
+        self.assertIsInstance(s, Schema)
+        self.assertEqual({}, s.serialize())
+        self.assertEqual({"a": 1}, s._raw.serialize())
+        self.assertEqual({"a": 1},
+                         pickle.loads(pickle.dumps(s))._raw.serialize())
+
     def test_can_make_empty_schema(self):
         s = Schema1()
         assert hasattr(s, 'my_str')
@@ -254,6 +267,124 @@ class TestSchemas(TestCase):
         self.assertEqual(_raw.second.prop, [1, 2])
         self.assertEqual(_raw.second.visible, True)
 
+    def test_raw_is_cached_until_changed(self):
+        ship = Ship(name=u"Pequod", captain={"first_name": u"Ahab"})
+        raw = ship._raw
+        self.assertIs(raw, ship._raw)
+        self.assertIs(ship.captain._raw, raw.captain)
+
+        ship.captain.first_name = u"Starbuck"
+        self.assertEqual(u"Starbuck", ship._raw.captain.first_name)
+        self.assertEqual(u"Ahab", raw.captain.first_name)
+        self.assertIs(ship._raw.captain, ship.captain._raw)
+
+        ship.name = u"Rachel"
+        self.assertEqual(u"Rachel", ship._raw.name)
+
+        # changing other schemas changes nothing
+        raw = ship._raw
+        Ship(name=u"Rachel").name = u"Delight"
+        GenericSchema(name=u"Rachel").name = u"Delight"
+        self.assertIs(raw, ship._raw)
+        self.assertIs(raw.captain, ship.captain._raw)
+
+        person = CompactPerson(first_name=u"Jack")
+        raw = person._raw
+        self.assertIs(raw, person._raw)
+        person.first_name = u"Stephen"
+        self.assertEqual(u"Stephen", person._raw.first_name)
+
+
+class CompactPerson(Schema):
+    compact = True
+
+    first_name = UnicodeField()
+    last_name = UnicodeField(default=u"Smith")
+
+
+class CompactShip(Schema):
+    compact = True
+    keep_raw_input = False
+
+    name = UnicodeField()
+    captain = Subschema(CompactPerson)
+    crew = ArrayField(CompactPerson)
+    __class = UnicodeField()
+
+
+class CompactFrigate(CompactShip):
+    guns = IntegerField()
+
+
+class TestCompactSchema(TestCase):
+    def setUp(self):
+        self.blob = {
+            "name": u"Surprise",
+            "captain": {"first_name": u"Jack", "last_name": u"Aubrey"},
+            "crew": [{"first_name": u"Stephen"}],
+            "__class": u"frigate",
+            "guns": 28,
+            "rating": 5,
+        }
+
+    def test_no_dict(self):
+        ship = CompactFrigate(**self.blob)
+        self.assertFalse(isinstance(vars(ship), dict))
+        with self.assertRaises(AttributeError):
+            ship.nonsense = 1
+        with self.assertRaises(TypeError):
+            class NotCompact(Person):
+                compact = True
+
+    def test_same_behavior(self):
+        ship = CompactFrigate(**self.blob)
+        self.assertEqual({
+            "name": u"Surprise",
+            "captain": {"first_name": u"Jack", "last_name": u"Aubrey"},
+            "crew": [{"first_name": u"Stephen", "last_name": u"Smith"}],
+            "class": u"frigate",
+            "guns": 28,
+        }, ship.serialize())
+        self.assertIsInstance(ship.captain, CompactPerson)
+        self.assertEqual(u"frigate", ship.__class)
+        self.assertTrue(ship.validate())
+        self.assertFalse(ship.is_empty)
+
+        ship.guns = 32
+        ship.captain.last_name = None
+        self.assertEqual(32, ship.guns)
+        self.assertEqual(u"Smith", ship.captain.last_name)
+
+    def test_raw_input(self):
+        person = CompactPerson(first_name=u"Jack", rank=u"Captain")
+        self.assertEqual(u"Captain", person._raw.rank)
+
+        ship = CompactFrigate(**self.blob)
+        self.assertIsNone(ship._raw.rating)
+        self.assertEqual(28, ship._raw.guns)
+
+    def test_pickle_and_copy(self):
+        ship = CompactFrigate(**self.blob)
+        expected = ship.serialize()
+        self.assertEqual(expected,
+                         pickle.loads(pickle.dumps(ship)).serialize())
+        self.assertEqual(expected, copy.deepcopy(ship).serialize())
+
+    def test_mapping(self):
+        class ToShip(Mapping):
+            target_schema = CompactFrigate
+
+            name = Get('n')
+            guns = Int(Get('g'))
+            __class = Const(u"frigate")
+
+        blob = {"n": u"Surprise", "g": "28"}
+        expected = ToShip().apply(blob).serialize()
+        self.assertEqual(28, expected["guns"])
+        self.assertEqual(expected,
+                         ToShip().apply(blob, lazy=True).serialize())
+        self.assertEqual(expected, ToShip().apply_serialized(blob))
+
 
 class TestReservedWords(TestCase):
     def test_can_dunder_reserved_words(self):
@@ -311,6 +442,25 @@ class TestReservedWords(TestCase):
         result = InToWhoa().apply({"finally": "it is here"})
         self.assertEqual(result.serialize(), {"lambda": "it is here"})
 
+    def test_name_tables(self):
+        class Fancy(Schema):
+            __if = IntegerField()
+            plain = IntegerField()
+            _under = IntegerField()
+
+        self.assertEqual("if", Fancy._attribute_names["_Fancy__if"])
+        self.assertEqual("plain", Fancy._attribute_names["plain"])
+        self.assertEqual("if", Fancy._kwarg_names["__if"])
+        self.assertEqual("plain", Fancy._kwarg_names["__plain__"])
+        self.assertNotIn("___under", Fancy._kwarg_names)
+
+        # names the tables don't know are handled as before
+        s = Fancy(___if__=1, __under=2, _under=3, nonsense=4)
+        self.assertEqual({"if": 1, "plain": None, "_under": 3},
+                         s.serialize())
+        s._Other__thing = 5
+        self.assertEqual(5, s.thing)
+
 
 class TestGenericSchema(TestCase):
     def test_can_make_a_generic_schema_from_dict(self):
@@ -392,6 +542,24 @@ class TestGenericSchema(TestCase):
         self.assertEqual(_raw.some_sub.data, [1, 2, 3])
         self.assertEqual(_raw.some_sub.thirdnested.not_junk, False)
 
+    def test_raw_is_cached_until_changed(self):
+        inner = GenericSchema(wow=1)
+        outer = GenericSchema(inner=inner, ints=[1, 2])
+        raw = outer._raw
+        self.assertIs(raw, outer._raw)
+        self.assertIs(inner._raw, raw.inner)
+
+        inner.wow = 2
+        self.assertEqual(2, outer._raw.inner.wow)
+        del outer.ints
+        self.assertIsNone(outer._raw.ints)
+
+        copied = pickle.loads(pickle.dumps(outer))
+        self.assertEqual(outer._raw.serialize(), copied._raw.serialize())
+        copied.inner.wow = 3
+        self.assertEqual(3, copied._raw.inner.wow)
+        self.assertEqual(2, outer._raw.inner.wow)
+
 
 class OneToTwoBase(Mapping):
     peas = Get('my_str')
@@ -535,6 +703,461 @@ class TestMappings(TestCase):
         )
 
 
+class TestApplyMany(TestCase):
+    def setUp(self):
+        self.originals = [
+            {"my_str": u"woof", "my_int": 1, "another_str": u"1"},
+            {"my_str": u"meow", "my_int": 2, "another_str": u"2"},
+            {"my_str": u"moo", "my_int": 3, "another_str": u"3"},
+        ]
+
+    def test_same_as_apply(self):
+        expected = [OneToTwo().apply(o).serialize() for o in self.originals]
+        results = OneToTwo().apply_many(self.originals)
+        self.assertEqual(expected, [r.serialize() for r in results])
+
+        results = OneToTwoBase().apply_many(self.originals)
+        self.assertEqual(expected, [r.serialize() for r in results])
+
+    def test_is_lazy(self):
+        consumed = []
+
+        def generate():
+            for original in self.originals:
+                consumed.append(original)
+                yield original
+
+        results = OneToTwo().apply_many(generate())
+        self.assertEqual([], consumed)
+        self.assertEqual(u"woof", next(results).peas)
+        self.assertEqual(1, len(consumed))
+
+    def test_chunks(self):
+        chunks = list(OneToTwo().apply_many(self.originals, chunk_size=2))
+        self.assertEqual([2, 1], [len(c) for c in chunks])
+        self.assertEqual(3, chunks[1][0].carrots)
+
+        with self.assertRaises(ValueError):
+            OneToTwo().apply_many(self.originals, chunk_size=0)
+
+
+class Crew(Schema):
+    name = UnicodeField()
+    captain = Subschema(Person)
+    first_mate = Subschema(Person)
+    cook = Subschema(Person)
+    sailors = ArrayField(Person)
+    ranks = ArrayField(int)
+    motto = UnicodeField(default="arr")
+
+
+class ToCrew(Mapping):
+    target_schema = Crew
+
+    name = Get('name')
+    captain = Get('captain')
+    first_mate = Const(None)
+    sailors = Get('sailors')
+    ranks = Get('ranks')
+
+
+class CompiledToCrew(ToCrew):
+    compiled = True
+
+
+class ShoutyField(UnicodeField):
+    def serialize(self, value, **kwargs):
+        return value.upper() if value else value
+
+
+class Shouty(Schema):
+    noise = ShoutyField()
+
+
+class ToShouty(Mapping):
+    target_schema = Shouty
+
+    noise = Get('noise')
+
+
+class TestApplySerialized(TestCase):
+    def assertSameAsApply(self, mapping, blob):
+        for implicit_nulls in (True, False):
+            expected = mapping.apply(blob).serialize(
+                implicit_nulls=implicit_nulls)
+            result = mapping.apply_serialized(
+                blob, implicit_nulls=implicit_nulls)
+            self.assertEqual(expected, result)
+
+    def test_same_as_serializing_apply(self):
+        blobs = [
+            {},
+            {"name": u"Pequod", "ranks": [1, 2],
+             "captain": {"first_name": u"Ahab"},
+             "sailors": [{"first_name": u"Ishmael"},
+                         Person(first_name=u"Queequeg"), None]},
+            {"captain": Person(), "sailors": (), "ranks": None},
+            {"captain": None, "sailors": None},
+        ]
+        for mapping in (ToCrew(), CompiledToCrew()):
+            for blob in blobs:
+                self.assertSameAsApply(mapping, blob)
+
+    def test_output(self):
+        blob = {"name": u"Pequod", "captain": {"first_name": u"Ahab"},
+                "sailors": [{"last_name": u"Starbuck"}]}
+        result = ToCrew().apply_serialized(blob, implicit_nulls=True)
+        self.assertEqual({
+            "name": u"Pequod",
+            "captain": {"first_name": u"Ahab"},
+            "sailors": [{"last_name": u"Starbuck"}],
+            "motto": "arr",
+        }, result)
+
+    def test_generic(self):
+        self.assertSameAsApply(OneToTwoBase(), {"my_str": u"woof",
+                                                "another_str": u"1"})
+        self.assertSameAsApply(ImpliesSchemas(), {"nom_de_plume": u"Twain"})
+
+    def test_typed_arrays(self):
+        class Series(Schema):
+            samples = ArrayField(float, typecode="d")
+            counts = ArrayField(int, typecode="b")
+
+        class ToSeries(Mapping):
+            target_schema = Series
+
+            samples = Get('samples')
+            counts = Get('counts')
+
+        for blob in ({"samples": [0.5, 1.5], "counts": (0, 1)},
+                     {"samples": [1, 1.5], "counts": [1, 1000]}):
+            self.assertSameAsApply(ToSeries(), blob)
+
+    def test_custom_fields(self):
+        self.assertSameAsApply(ToShouty(), {"noise": u"woof"})
+        self.assertEqual({"noise": u"WOOF"},
+                         ToShouty().apply_serialized({"noise": u"woof"}))
+
+
+class TestLazyApply(TestCase):
+    def setUp(self):
+        self.calls = calls = []
+
+        def expensive(value):
+            calls.append(value)
+            return value * 2
+
+        class Lazy(Mapping):
+            source_schema = Schema1
+            target_schema = Schema2
+
+            peas = Get('my_str')
+            carrots = Do(expensive, Get('my_int'))
+            beans = Do(expensive, Int(Get('another_str')))
+            extra = Do(expensive, Const(10))
+
+        class LazyGeneric(Lazy):
+            target_schema = None
+
+        self.mapping = Lazy()
+        self.generic = LazyGeneric()
+        self.original = {"my_str": u"woof", "my_int": 2, "another_str": u"3"}
+
+    def test_only_computes_what_is_read(self):
+        for mapping in (self.mapping, self.generic):
+            del self.calls[:]
+            result = mapping.apply(self.original, lazy=True)
+            self.assertEqual([], self.calls)
+
+            self.assertEqual(4, result.carrots)
+            self.assertEqual(4, result.carrots)
+            self.assertEqual([2], self.calls)
+
+    def test_same_as_eager(self):
+        for mapping in (self.mapping, self.generic):
+            eager = mapping.apply(self.original)
+            lazy = mapping.apply(self.original, lazy=True)
+            self.assertIsInstance(lazy, type(eager))
+            self.assertEqual(eager.serialize(), lazy.serialize())
+            self.assertTrue(mapping.apply(self.original, lazy=True).validate())
+
+            raw = mapping.apply(self.original, lazy=True)._raw
+            self.assertEqual(eager._raw.serialize(), raw.serialize())
+
+        for mapping in (self.mapping, self.generic):
+            eager = mapping.apply(self.original)
+            lazy = pickle.loads(pickle.dumps(
+                mapping.apply(self.original, lazy=True)))
+            self.assertIsInstance(lazy, type(eager))
+            self.assertEqual(eager.serialize(), lazy.serialize())
+            lazy = copy.deepcopy(mapping.apply(self.original, lazy=True))
+            self.assertEqual(eager.serialize(), lazy.serialize())
+
+    def test_validate_computes_everything(self):
+        blob = dict(self.original, my_str=1)
+        result = self.mapping.apply(blob, lazy=True)
+        with self.assertRaises(Invalid):
+            result.validate()
+
+    def test_can_overwrite_before_computing(self):
+        result = self.mapping.apply(self.original, lazy=True)
+        result.carrots = 1
+        self.assertEqual(1, result.carrots)
+        self.assertEqual([], self.calls)
+
+    def test_failed_transformation_fails_again(self):
+        blob = dict(self.original, another_str=u"three")
+        for mapping in (self.mapping, self.generic):
+            result = mapping.apply(blob, lazy=True)
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    result.beans
+            with self.assertRaises(ValueError):
+                result.serialize()
+
+
+class ViewedShip(Mapping):
+    source_schema = Crew
+    source_view = True
+
+    name = Get('name')
+    captain = Get('captain', 'first_name')
+    mate = Get('first_mate', 'last_name')
+    sailors = Get('sailors')
+    motto = Get('motto')
+    everything = All()
+
+
+class CompiledViewedShip(ViewedShip):
+    compiled = True
+
+
+class TestSchemaView(TestCase):
+    def setUp(self):
+        self.blob = {
+            "name": u"Pequod",
+            "captain": {"first_name": u"Ahab"},
+            "sailors": [{"first_name": u"Ishmael"}, Person(), None],
+            "ranks": None,
+            "whale": u"white",
+        }
+
+    def test_no_copy(self):
+        view = schema_view(Crew, self.blob)
+        self.assertIsInstance(view, Crew)
+        self.assertIs(self.blob, view._view_data)
+        self.assertIs(self.blob["sailors"][1], view.sailors[1])
+        self.assertIs(view.captain, view.captain)
+        self.assertIsInstance(view.sailors[0], Person)
+        with self.assertRaises(AttributeError):
+            view.name = u"Rachel"
+        with self.assertRaises(AttributeError):
+            view.captain.first_name = u"Gardiner"
+
+    def test_same_as_schema(self):
+        for blob in (self.blob, {}, {"captain": None, "sailors": ()}):
+            view = schema_view(Crew, blob)
+            schema = Crew(**blob)
+            for implicit_nulls in (True, False):
+                self.assertEqual(schema.serialize(implicit_nulls),
+                                 view.serialize(implicit_nulls))
+            self.assertEqual(schema._raw.serialize(), view._raw.serialize())
+            self.assertEqual(schema.is_empty, view.is_empty)
+            self.assertEqual(u"arr", view.motto)
+
+        ship = dict(self.blob, __class=u"frigate", guns=28, crew=[{}])
+        self.assertEqual(CompactFrigate(**ship).serialize(),
+                         schema_view(CompactFrigate, ship).serialize())
+
+    def test_copies_are_schemas(self):
+        view = schema_view(Crew, self.blob)
+        for copied in (copy.deepcopy(view), pickle.loads(pickle.dumps(view))):
+            self.assertIs(Crew, type(copied))
+            self.assertEqual(view.serialize(), copied.serialize())
+            copied.captain.first_name = u"Gardiner"
+        self.assertEqual(u"Ahab", view.captain.first_name)
+
+    def test_mapped_results_are_schemas(self):
+        class ViewedCrew(Mapping):
+            source_schema = Crew
+            target_schema = Crew
+            source_view = True
+
+            captain = Get('captain')
+            sailors = Get('sailors')
+
+        result = ViewedCrew().apply(self.blob)
+        self.assertIs(Person, type(result.captain))
+        self.assertIs(Person, type(result.sailors[0]))
+        result.captain.first_name = u"Gardiner"
+        result.sailors[0].first_name = u"Starbuck"
+        copied = pickle.loads(pickle.dumps(result))
+        self.assertEqual(result.serialize(), copied.serialize())
+        self.assertEqual({"first_name": u"Ahab"}, self.blob["captain"])
+
+    def test_custom_storage_is_copied(self):
+        class Shouting(Schema):
+            noise = ShoutyField()
+
+            def __setattr__(self, name, value):
+                if name == "noise":
+                    value = value.upper()
+                super(Shouting, self).__setattr__(name, value)
+
+        result = schema_view(Shouting, {"noise": u"woof"})
+        self.assertIs(Shouting, type(result))
+        self.assertEqual(u"WOOF", result.noise)
+
+    def test_mapping(self):
+        plain = type("PlainShip", (ViewedShip,), {"source_view": False})()
+        for mapping in (ViewedShip(), CompiledViewedShip()):
+            for blob in (self.blob, {}):
+                result = mapping.apply(blob)
+                self.assertEqual(plain.apply(blob).serialize(),
+                                 result.serialize())
+                self.assertEqual(
+                    [r.serialize() for r in plain.apply_many([blob])],
+                    [r.serialize() for r in mapping.apply_many([blob])])
+        self.assertEqual(u"white",
+                         ViewedShip().apply(self.blob).everything.whale)
+
+
+class TrackedCrewCase(TestCase):
+    """Maps a crew, noting the fields transformed in `self.calls`."""
+    def setUp(self):
+        self.calls = calls = []
+
+        def track(name):
+            def tracked(value):
+                calls.append(name)
+                return value
+            return tracked
+
+        class Inner(Mapping):
+            target_schema = Person
+
+            first_name = Do(track("first"), Get('first'))
+            last_name = Do(track("last"), Get('last'))
+
+        class Outer(Mapping):
+            target_schema = Crew
+
+            name = Concat(Do(track("name"), Get('name')), '!')
+            captain = Submapping(Inner, Get('captain'))
+            sailors = ManySubmap(Inner, Get('sailors'))
+
+        self.mapping = Outer()
+        self.source = {
+            "name": u"Pequod",
+            "captain": {"first": u"Captain", "last": u"Ahab"},
+            "sailors": [{"first": u"Ishmael"}, {"first": u"Queequeg"}],
+        }
+
+
+class TestProjection(TrackedCrewCase):
+    def test_only_named_fields_transformed(self):
+        result = self.mapping.apply(self.source, only=["name"])
+        self.assertEqual(["name"], self.calls)
+        self.assertEqual({"name": u"Pequod!", "motto": "arr"},
+                         result.serialize(implicit_nulls=True))
+
+    def test_dotted_names(self):
+        only = ["captain.last_name", "sailors.first_name", "nonsense"]
+        result = self.mapping.apply(self.source, only=only)
+        self.assertEqual(["first", "first", "last"], sorted(self.calls))
+        self.assertEqual({
+            "captain": {"last_name": u"Ahab"},
+            "sailors": [{"first_name": u"Ishmael"},
+                        {"first_name": u"Queequeg"}],
+            "motto": "arr",
+        }, result.serialize(implicit_nulls=True))
+
+    def test_whole_field_wins(self):
+        only = ["captain.last_name", "captain"]
+        result = self.mapping.apply(self.source, only=only)
+        self.assertEqual(u"Captain", result.captain.first_name)
+        self.assertEqual(u"Ahab", result.captain.last_name)
+
+    def test_other_apis(self):
+        only = ["name", "captain.first_name"]
+        expected = self.mapping.apply(self.source, only=only).serialize()
+        self.assertEqual(expected, self.mapping.apply_serialized(
+            self.source, only=only))
+        self.assertEqual(expected, self.mapping.apply(
+            self.source, only=only, lazy=True).serialize())
+        self.assertEqual([expected], [r.serialize() for r in
+                                      self.mapping.apply_many(
+                                          [self.source], only=only)])
+        self.assertNotIn("last", self.calls)
+
+
+class TestIncremental(TrackedCrewCase):
+    def test_dependencies(self):
+        class Everything(Mapping):
+            name = Get('name')
+            everything = All()
+
+        self.assertEqual({
+            "name": frozenset([("name",)]),
+            "captain": frozenset([("captain",)]),
+            "sailors": frozenset([("sailors",)]),
+        }, self.mapping.dependencies())
+        self.assertEqual({"name": frozenset([("name",)]), "everything": None},
+                         Everything.dependencies())
+
+    def test_affected_fields(self):
+        self.assertEqual(["captain"], self.mapping.affected_fields(
+            ["captain.last"]))
+        self.assertEqual(["sailors"], self.mapping.affected_fields(
+            [("sailors", 1, "first")]))
+        self.assertEqual(["captain", "name"], sorted(
+            self.mapping.affected_fields(["name", "captain"])))
+        self.assertEqual([], self.mapping.affected_fields(["ship"]))
+
+    def test_apply_incremental(self):
+        previous = self.mapping.apply(self.source)
+        self.calls[:] = []
+
+        source = dict(self.source, name=u"Rachel")
+        result = self.mapping.apply_incremental(previous, source, ["name"])
+        self.assertEqual(["name"], self.calls)
+        self.assertIsInstance(result, Crew)
+        self.assertEqual(self.mapping.apply(source).serialize(),
+                         result.serialize())
+        self.assertIs(previous.captain, result.captain)
+        self.assertEqual(u"Pequod!", previous.name)
+
+    def test_apply_incremental_undeclared(self):
+        class Extra(type(self.mapping)):
+            ship = Get('name')
+
+        mapping = Extra()
+        previous = mapping.apply(self.source)
+        source = dict(self.source, captain={"first": u"Ahab"})
+        result = mapping.apply_incremental(previous, source, ["captain"])
+        expected = mapping.apply(source)
+        self.assertEqual(expected.serialize(), result.serialize())
+        self.assertEqual(u"Pequod", result._raw_input["ship"])
+
+    def test_apply_incremental_serialized(self):
+        previous = self.mapping.apply_serialized(self.source,
+                                                 implicit_nulls=True)
+        self.calls[:] = []
+
+        source = dict(self.source, captain={"first": u"Ahab"})
+        result = self.mapping.apply_incremental(
+            previous, source, ["captain.last"], implicit_nulls=True)
+        self.assertEqual(["first", "last"], sorted(self.calls))
+        self.assertEqual(self.mapping.apply_serialized(
+            source, implicit_nulls=True), result)
+
+        source = dict(source, name=None)
+        result = self.mapping.apply_incremental(
+            previous, source, ["name"], implicit_nulls=True)
+        self.assertEqual(u"!", result["name"])
+
+
 class TestInheritance(TestCase):
     """Verify that the metaprogramming tricks didn't go awry"""
     def test_schemas_can_inherit(self):
@@ -0,0 +1,145 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import TestCase
+
+from bfh import Mapping, Schema
+from bfh.cli import load_mapping, main, process_line, run
+from bfh.fields import IntegerField
+from bfh.transformations import Get, Int, ParseDate
+
+
+class Count(Schema):
+    count = IntegerField()
+    at = IntegerField(required=False)
+
+
+class ToCount(Mapping):
+    target_schema = Count
+
+    count = Int(Get("n"))
+    at = Get("at")
+
+
+class ToDate(Mapping):
+    when = ParseDate(Get("when"))
+
+
+class TestProcessLine(TestCase):
+    def test_ok(self):
+        ok, text = process_line(ToCount(), (1, u'{"n": "2"}\n'))
+        self.assertTrue(ok)
+        self.assertEqual({"count": 2, "at": None}, json.loads(text))
+
+        ok, text = process_line(ToCount(), (1, u'{"n": "2"}\n'),
+                                implicit_nulls=True)
+        self.assertEqual({"count": 2}, json.loads(text))
+
+    def test_apply_overridden(self):
+        class Stamped(ToDate):
+            def apply(self, blob, **kwargs):
+                result = super(Stamped, self).apply(blob, **kwargs)
+                result.stamp = 1
+                return result
+
+        ok, text = process_line(Stamped(), (1, u'{"when": "2017-01-02"}'))
+        self.assertEqual(1, json.loads(text)["stamp"])
+
+    def test_dates(self):
+        ok, text = process_line(ToDate(), (1, u'{"when": "2017-01-02"}'))
+        self.assertEqual({"when": "2017-01-02T00:00:00+00:00"},
+                         json.loads(text))
+
+    def test_errors(self):
+        ok, text = process_line(ToCount(), (3, u'{"n": "x"}\n'))
+        self.assertFalse(ok)
+        error = json.loads(text)
+        self.assertEqual(3, error["line"])
+        self.assertEqual(u'{"n": "x"}', error["input"])
+        self.assertTrue(error["error"].startswith("ValueError"))
+
+        ok, text = process_line(ToCount(), (1, u'not json'))
+        self.assertFalse(ok)
+
+    def test_validate(self):
+        ok, text = process_line(ToCount(), (1, u'{"at": "x"}'))
+        self.assertTrue(ok)
+        ok, text = process_line(ToCount(), (1, u'{"at": "x"}'),
+                                validate=True)
+        self.assertFalse(ok)
+        self.assertIn("Invalid", json.loads(text)["error"])
+
+    def test_validate_returns_false(self):
+        class Picky(Count):
+            def validate(self):
+                return False
+
+        class ToPicky(ToCount):
+            target_schema = Picky
+
+        ok, text = process_line(ToPicky(), (1, u'{"n": 1}'), validate=True)
+        self.assertFalse(ok)
+        self.assertIn("Invalid", json.loads(text)["error"])
+
+
+class TestRun(TestCase):
+    def setUp(self):
+        self.lines = [u'{"n": %d}\n' % i for i in range(10)]
+        self.lines[4] = u'{"n": "four"}\n'
+        self.lines.insert(2, u'\n')
+
+    def test_errors_stop(self):
+        output = StringIO()
+        with self.assertRaises(ValueError):
+            run(ToCount, iter(self.lines), output)
+        self.assertEqual(4, len(output.getvalue().splitlines()))
+
+    def test_error_sink(self):
+        for workers in (None, 2):
+            output = StringIO()
+            errors = StringIO()
+            written, failed = run(ToCount, iter(self.lines), output,
+                                  errors=errors, workers=workers,
+                                  chunk_size=3)
+            self.assertEqual((9, 1), (written, failed))
+            self.assertEqual(
+                [i for i in range(10) if i != 4],
+                [json.loads(line)["count"]
+                 for line in output.getvalue().splitlines()])
+            self.assertEqual(6, json.loads(errors.getvalue())["line"])
+
+
+class TestMain(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_main(self):
+        with open(self.path("in.jsonl"), "w") as f:
+            f.write('{"n": 1}\n{"n": "x"}\n{"n": 3}\n')
+
+        status = main(["test_cli:ToCount", self.path("in.jsonl"),
+                       "-o", self.path("out.jsonl"),
+                       "--errors", self.path("errors.jsonl"),
+                       "--implicit-nulls"])
+        self.assertEqual(0, status)
+        with open(self.path("out.jsonl")) as f:
+            self.assertEqual('{"count": 1}\n{"count": 3}\n', f.read())
+        with open(self.path("errors.jsonl")) as f:
+            self.assertEqual(2, json.loads(f.read())["line"])
+
+        status = main(["test_cli:ToCount", self.path("in.jsonl"),
+                       "-o", self.path("out.jsonl")])
+        self.assertEqual(1, status)
+
+    def test_load_mapping(self):
+        self.assertIs(ToCount, load_mapping("test_cli:ToCount"))
+        with self.assertRaises(ValueError):
+            load_mapping("test_cli")
@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from bfh.common import LRUCache, chunked
+
+
+class TestChunked(TestCase):
+    def test_chunks(self):
+        self.assertEqual([[1, 2], [3, 4], [5]],
+                         list(chunked(iter([1, 2, 3, 4, 5]), 2)))
+        self.assertEqual([], list(chunked([], 2)))
+
+    def test_bad_size(self):
+        with self.assertRaises(ValueError):
+            chunked([1], 0)
+
+
+class TestLRUCache(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+        self.assertEqual({"hits": 3, "misses": 1, "evictions": 1,
+                          "size": 2, "maxsize": 2}, cache.info())
+
+    def test_ttl(self):
+        now = [0]
+        cache = LRUCache(10, ttl=5, timer=lambda: now[0])
+        cache.set("a", 1)
+        now[0] = 4
+        self.assertEqual(1, cache.get("a"))
+        now[0] = 5
+        self.assertEqual("gone", cache.get("a", "gone"))
+        self.assertEqual(0, len(cache))
+
+    def test_unhashable(self):
+        with self.assertRaises(TypeError):
+            LRUCache().get([1])
+
+    def test_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
@@ -0,0 +1,403 @@
+from unittest import TestCase
+
+from bfh import Schema, Mapping, GenericSchema
+from bfh.common import nullish
+from bfh.compiler import compile_serializer, compile_validator
+from bfh.exceptions import Invalid, Missing
+from bfh.fields import (
+    ArrayField,
+    BooleanField,
+    DatetimeField,
+    Field,
+    IntegerField,
+    IsoDateString,
+    NumberField,
+    ObjectField,
+    Subschema,
+    UnicodeField,
+)
+from bfh.transformations import (
+    All,
+    Bool,
+    Concat,
+    Const,
+    Do,
+    Get,
+    Int,
+    ManySubmap,
+    Num,
+    Str,
+    Submapping,
+)
+
+
+class Source(Schema):
+    id = IntegerField()
+    name = UnicodeField()
+    width = IntegerField()
+
+
+class Inner(Schema):
+    goal = IntegerField()
+
+
+class Target(Schema):
+    id = UnicodeField()
+    name = UnicodeField()
+    double = IntegerField()
+    inner = Subschema(Inner)
+
+
+class InnerMapping(Mapping):
+    target_schema = Inner
+
+    goal = Get('goal')
+
+
+class Interpreted(Mapping):
+    source_schema = Source
+    target_schema = Target
+
+    id = Concat('square', ':', Str(Get('id')), Get('missing'))
+    name = Get('name')
+    double = Do(lambda x: x * 2, Get('width'))
+    inner = Submapping(InnerMapping, Const({'goal': 4}))
+
+
+class Compiled(Interpreted):
+    compiled = True
+
+
+class Schemaless(Mapping):
+    compiled = True
+
+    deep = Get('a', 'b', 'c')
+    defaulted = Get('a', 'nope', default=3)
+    number = Num(Get('n'))
+    integer = Int(Get('n'), required=False)
+    boolean = Bool(Get('a', 'b', 'c'))
+    strict = Concat(Get('a', 'b', 'c'), '!', strict=True)
+    everything = All()
+    many = ManySubmap(InnerMapping, Get('items'))
+
+
+class TestCompiledMappings(TestCase):
+    def test_only_compiled_when_asked(self):
+        self.assertIsNone(Interpreted._compiled_apply)
+        self.assertIsNotNone(Compiled._compiled_apply)
+
+        class NotAnyMore(Compiled):
+            compiled = False
+
+        self.assertIsNone(NotAnyMore._compiled_apply)
+
+    def test_same_as_interpreted(self):
+        source = {"id": 1, "name": "peggy", "width": 50}
+        expected = Interpreted().apply(source)
+        result = Compiled().apply(source)
+
+        self.assertIsInstance(result, Target)
+        self.assertEqual(expected.serialize(), result.serialize())
+        self.assertEqual({
+            "id": u"square:1",
+            "name": "peggy",
+            "double": 100,
+            "inner": {"goal": 4},
+        }, result.serialize())
+
+        schema_source = Source(**source)
+        self.assertEqual(expected.serialize(),
+                         Compiled().apply(schema_source).serialize())
+
+    def test_schemaless(self):
+        source = {
+            "a": {"b": {"c": "wow"}},
+            "n": "2",
+            "items": [{"goal": 1}, None, {"goal": 2}],
+        }
+        result = Schemaless().apply(source)
+        self.assertIsInstance(result, GenericSchema)
+        self.assertEqual({
+            "deep": "wow",
+            "defaulted": 3,
+            "number": 2.0,
+            "integer": 2,
+            "boolean": True,
+            "strict": "wow!",
+            "everything": source,
+            "many": [{"goal": 1}, {"goal": None}, {"goal": 2}],
+        }, result.serialize())
+
+        empty = Schemaless().apply({"a": {"b": {"c": ""}}}).serialize()
+        self.assertEqual("", empty["deep"])
+        self.assertEqual(None, empty["integer"])
+        self.assertEqual([], empty["many"])
+
+    def test_required_get_raises_missing(self):
+        class Strict(Mapping):
+            compiled = True
+            value = Get('a', 'b', required=True)
+
+        self.assertEqual(1, Strict().apply({"a": {"b": 1}}).value)
+        with self.assertRaises(Missing):
+            Strict().apply({"a": {}})
+
+    def test_custom_transformations_are_called(self):
+        class Shout(Str):
+            def function(self, source, *call_args):
+                return call_args[0].upper()
+
+        class Loud(Mapping):
+            compiled = True
+            noise = Shout(Get('noise'))
+
+        self.assertEqual("WOOF", Loud().apply({"noise": "woof"}).noise)
+
+    def test_generated_source_is_flat(self):
+        source = Compiled._compiled_apply.source
+        self.assertTrue(source.startswith("def apply(blob):"))
+        self.assertNotIn("function", source)
+
+
+class Payload(object):
+    """Counts how often its attributes are looked up."""
+    def __init__(self, lookups, **values):
+        self.lookups = lookups
+        self.values = values
+
+    def __getattr__(self, name):
+        self.lookups.append(name)
+        return self.values.get(name)
+
+
+class Wide(Mapping):
+    compiled = True
+
+    a = Get('payload', 'attributes', 'a')
+    b = Get('payload', 'attributes', 'b')
+    c = Str(Get('payload', 'attributes', 'a'))
+    d = Concat(Str(Get('payload', 'attributes', 'a')), '!')
+    e = Get('payload', 'attributes', 'b', default='?')
+    f = Do(len, Get('payload', 'attributes', 'b'))
+    g = Do(len, Get('payload', 'attributes', 'b'))
+
+
+class TestCommonSubexpressions(TestCase):
+    def test_shared_prefix_walked_once(self):
+        lookups = []
+        blob = {"payload": Payload(
+            lookups, attributes=Payload(lookups, a=1, b="bb"))}
+
+        result = Wide().apply(blob)
+        self.assertEqual({
+            "a": 1, "b": "bb", "c": u"1", "d": u"1!", "e": "bb",
+            "f": 2, "g": 2,
+        }, result.serialize())
+        # the Get with a default has different semantics, so walks again
+        self.assertEqual(["attributes", "a", "b", "attributes", "b"],
+                         lookups)
+
+    def test_identical_transformations_shared(self):
+        source = Wide._compiled_apply.source
+        # one Str coercion, used by both c and d
+        self.assertEqual(1, source.count(" in _k"))
+
+    def test_side_effects_not_shared(self):
+        calls = []
+
+        def count(value):
+            calls.append(value)
+            return value
+
+        class Counting(Mapping):
+            compiled = True
+
+            one = Do(count, Get('a'))
+            two = Do(count, Get('a'))
+
+        Counting().apply({"a": 1})
+        self.assertEqual([1, 1], calls)
+
+
+class Shout(UnicodeField):
+    def serialize(self, value, **kwargs):
+        return (value or u"").upper()
+
+
+class Everything(Schema):
+    text = UnicodeField()
+    raw = UnicodeField()
+    count = IntegerField(default=lambda: 7)
+    inner = Subschema(Inner)
+    obj = ObjectField()
+    inners = ArrayField(Inner)
+    ints = ArrayField(int)
+    shout = Shout()
+    when = DatetimeField()
+    __private = UnicodeField()
+
+
+def interpreted_serialize(self, implicit_nulls=False):
+    # Schema.serialize, before it was compiled
+    outd = {}
+    for name in self._field_names:
+        field = self._fields.get(name)
+        value = getattr(self, name)
+        if hasattr(field, "serialize"):
+            value = field.serialize(value, implicit_nulls=implicit_nulls)
+        if hasattr(value, "serialize"):
+            value = value.serialize(implicit_nulls=implicit_nulls)
+        if implicit_nulls and nullish(value, implicit_nulls=implicit_nulls):
+            pass
+        else:
+            outd[name] = value
+    return outd
+
+
+class TestCompileSerializer(TestCase):
+    def test_same_as_interpreted(self):
+        blobs = [
+            dict(text=u"x", raw=b"bytes", inner={"goal": 1},
+                 obj={"k": None}, inners=[{"goal": None}, None, Inner()],
+                 ints=[1, 0, None], shout=u"hi", __private=u"p"),
+            dict(text=None, raw=None, inner=None, obj=GenericSchema(x=None),
+                 inners=None, ints=(), __private=None),
+            dict(inner=Inner(), obj=None, inners=[], text=5, __private=u""),
+        ]
+        for blob in blobs:
+            for implicit_nulls in (False, True):
+                self.assertEqual(
+                    interpreted_serialize(Everything(**blob), implicit_nulls),
+                    Everything(**blob).serialize(implicit_nulls))
+
+    def test_generated_once_per_class(self):
+        class Outer(Schema):
+            inner = Subschema(Inner)
+
+        self.assertIsNone(Outer._serializers)
+        Outer().serialize()
+        serializers = Outer._serializers
+        Outer().serialize(implicit_nulls=True)
+        self.assertIs(serializers, Outer._serializers)
+
+        class Subclass(Outer):
+            extra = IntegerField()
+
+        self.assertIsNone(Subclass._serializers)
+        self.assertEqual({"extra": 1, "inner": {"goal": None}},
+                         Subclass(extra=1).serialize())
+
+    def test_inlined(self):
+        source = compile_serializer(Everything, implicit_nulls=True).source
+        self.assertNotIn("getattr(self, 'text')", source)
+        self.assertIn("getattr(self, 'private')", source)
+        self.assertIn("for _i in", source)
+
+    def test_overridden_serialize_kept(self):
+        class Custom(Inner):
+            def serialize(self, implicit_nulls=False):
+                return "custom"
+
+        self.assertEqual("custom", Custom().serialize())
+
+
+class Sulky(IntegerField):
+    def validate(self, value):
+        return value != 13
+
+
+class Checked(Schema):
+    name = UnicodeField()
+    strict = UnicodeField(strict=True, required=False)
+    count = IntegerField()
+    ratio = NumberField(required=False)
+    flag = BooleanField(required=False)
+    when = IsoDateString(required=False)
+    anything = Field()
+    maybe = Field(required=False)
+    obj = ObjectField(required=False)
+    inner = Subschema(Inner)
+    optional = Subschema(Inner, required=False)
+    inners = ArrayField(Inner, required=False)
+    ints = ArrayField(int, required=False)
+    sulky = Sulky(required=False)
+
+
+def interpreted_validate(self):
+    # Schema.validate, before it was compiled
+    return all([v.validate(getattr(self, k))
+                for k, v in self._fields.items()])
+
+
+def outcome(validate, instance):
+    try:
+        return validate(instance)
+    except Invalid as e:
+        return str(e)
+
+
+class TestCompileValidator(TestCase):
+    def setUp(self):
+        self.valid = dict(name=u"x", count=1, anything=0, inner={"goal": 1})
+        self.blobs = [
+            self.valid,
+            dict(self.valid, strict=u"s", ratio=0.5, flag=False,
+                 when=u"2017-01-01T00:00:00", obj={"k": 1},
+                 optional={"goal": 2}, inners=[{"goal": 3}], ints=[1, 2]),
+            dict(self.valid, name=b"bytes"),
+            dict(self.valid, name=5),
+            dict(self.valid, name=None),
+            dict(self.valid, strict=b"bytes"),
+            dict(self.valid, count=u"1"),
+            dict(self.valid, count=None),
+            dict(self.valid, ratio=1),
+            dict(self.valid, when=u"yesterday"),
+            dict(self.valid, anything=None),
+            dict(self.valid, obj=[]),
+            dict(self.valid, obj=GenericSchema(k=1)),
+            dict(self.valid, inner={"goal": u"1"}),
+            dict(self.valid, inner=None),
+            dict(self.valid, optional={"goal": u"2"}),
+            dict(self.valid, inners=[{"goal": u"3"}]),
+            dict(self.valid, ints=[1, u"2"]),
+            dict(self.valid, sulky=13),
+        ]
+
+    def test_same_as_interpreted(self):
+        for blob in self.blobs:
+            self.assertEqual(outcome(interpreted_validate, Checked(**blob)),
+                             outcome(Checked.validate, Checked(**blob)))
+
+    def test_inlined(self):
+        source = compile_validator(Checked).source
+        self.assertNotIn("getattr(self, 'count')", source)
+        self.assertIn("isinstance(", source)
+
+    def test_errors(self):
+        self.assertEqual([], Checked(**self.valid).errors())
+
+        bad = Checked(name=5, count=None, inner={"goal": u"1"},
+                      inners=[{"goal": 1}, {"goal": u"2"}, Source()],
+                      ints=[1, u"2", u"3"], sulky=13)
+        errors = bad.errors()
+        self.assertEqual([
+            "anything", "count", "inner.goal", "inners.1.goal", "inners.2",
+            "ints.1", "ints.2", "name", "sulky",
+        ], sorted(path for path, error in errors))
+        for path, error in errors:
+            self.assertIsInstance(error, Invalid)
+        with self.assertRaises(Invalid):
+            bad.validate()
+
+    def test_custom_validate_kept(self):
+        class Picky(Inner):
+            def validate(self):
+                raise Invalid("no")
+
+        class Outer(Schema):
+            inner = Subschema(Picky)
+
+        self.assertEqual([("", "no")], [
+            (path, str(error)) for path, error in Picky().errors()])
+        self.assertEqual(["inner"], [
+            path for path, error in Outer().errors()])
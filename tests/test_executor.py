@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+from bfh import Schema, Mapping
+from bfh.executor import MappingExecutor
+from bfh.fields import IntegerField
+from bfh.transformations import Do, Get
+
+
+class Number(Schema):
+    value = IntegerField()
+    double = IntegerField()
+
+
+def explode(value):
+    if value == 13:
+        raise ValueError("unlucky")
+    return value * 2
+
+
+class Double(Mapping):
+    target_schema = Number
+
+    value = Get('n')
+    double = Do(explode, Get('n'))
+
+
+class Schemaless(Mapping):
+    value = Get('n')
+
+
+class TestMappingExecutor(TestCase):
+    def setUp(self):
+        self.blobs = [{"n": i} for i in range(12)]
+        self.expected = [{"value": i, "double": i * 2} for i in range(12)]
+
+    def test_ordered(self):
+        with MappingExecutor(Double, processes=2, chunk_size=5) as executor:
+            results = list(executor.map(iter(self.blobs)))
+        self.assertTrue(all(isinstance(r, Number) for r in results))
+        self.assertEqual(self.expected, [r.serialize() for r in results])
+
+    def test_unordered(self):
+        with MappingExecutor(Double, processes=2, chunk_size=1,
+                             ordered=False, serialize=True) as executor:
+            results = list(executor.map(self.blobs))
+        self.assertEqual(
+            sorted(self.expected, key=lambda r: r["value"]),
+            sorted(results, key=lambda r: r["value"]))
+
+    def test_generic_results(self):
+        with MappingExecutor(Schemaless, processes=2) as executor:
+            results = list(executor.map(self.blobs))
+        self.assertEqual(list(range(12)), [r.value for r in results])
+
+    def test_can_map_twice(self):
+        with MappingExecutor(Double, processes=2, serialize=True,
+                             max_pending=1) as executor:
+            self.assertEqual(self.expected, list(executor.map(self.blobs)))
+            self.assertEqual(self.expected, list(executor.map(self.blobs)))
+
+    def test_errors_raised(self):
+        blobs = [{"n": i} for i in range(20)]
+        with MappingExecutor(Double, processes=2, chunk_size=3) as executor:
+            with self.assertRaises(ValueError):
+                list(executor.map(blobs))
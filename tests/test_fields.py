@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 from unittest import TestCase
 
+import array
 import datetime
+import json
 
 import six
 
-from bfh import Schema
+from bfh import Schema, Mapping, GenericSchema
 from bfh.exceptions import Invalid
 from bfh.fields import (
     ObjectField,
@@ -15,6 +17,7 @@ from bfh.fields import (
     ArrayField,
     Subschema
 )
+from bfh.transformations import All
 
 
 class TestFieldValidation(TestCase):
@@ -403,6 +406,31 @@ class TestSubSchemaCoercion(TestCase):
         my_outer = Outer(inner={"foo": "bar"})
         self.assertIsInstance(my_outer.inner, Inner)
 
+    def test_subschema_made_when_wanted(self):
+        made = []
+
+        class Inner(Schema):
+            foo = UnicodeField()
+
+            def __init__(self, *args, **kwargs):
+                made.append(kwargs)
+                super(Inner, self).__init__(*args, **kwargs)
+
+        class Outer(Schema):
+            inner = Subschema(Inner)
+            other = Subschema(Inner)
+
+        my_outer = Outer(inner={"foo": "bar"})
+        self.assertEqual([{"foo": "bar"}], made)
+
+        self.assertIsInstance(my_outer.other, Inner)
+        self.assertIs(my_outer.other, my_outer.other)
+        self.assertEqual(2, len(made))
+
+        self.assertIsNone(Outer(inner=None).inner)
+        self.assertEqual({"inner": {"foo": None}, "other": {"foo": None}},
+                         Outer().serialize())
+
 
 class TestNoneSafe(TestCase):
     """
@@ -428,3 +456,88 @@ class TestNoneSafe(TestCase):
             assert cls(stuff=[])
             assert cls()
             assert cls(stuff=None)
+
+
+class TestTypedArrays(TestCase):
+    class Series(Schema):
+        samples = ArrayField(float, typecode="d")
+        counts = ArrayField(int, typecode="b", required=False)
+
+    def test_stored_compactly(self):
+        series = self.Series(samples=[1.5, 2.5], counts=[1, 2])
+        self.assertEqual(array.array("d", [1.5, 2.5]), series.samples)
+        self.assertEqual(array.array("b", [1, 2]), series.counts)
+
+        # kept as they are when they wouldn't fit, or are of other types
+        series = self.Series(samples=[1.5, 2], counts=[1, 1000])
+        self.assertEqual([1.5, 2], series.samples)
+        self.assertEqual([1, 1000], series.counts)
+        series = self.Series(samples=[], counts=(True,))
+        self.assertEqual([], series.samples)
+        self.assertEqual((True,), series.counts)
+
+    def test_typecode_must_fit(self):
+        for array_type, typecode in ((float, "f"), (int, "d"), (bool, "b"),
+                                     (None, "d"), (float, "x"),
+                                     (int, "bB"), (int, "")):
+            with self.assertRaises(ValueError):
+                ArrayField(array_type, typecode=typecode)
+
+    def test_typed_array_validation(self):
+        field = ArrayField(float, typecode="d")
+        assert field.validate(array.array("d", [1.5]))
+        assert field.validate(array.array("f", [0.5]))
+        with self.assertRaises(Invalid):
+            field.validate(array.array("l", [1]))
+        with self.assertRaises(Invalid):
+            field.validate([1.5, 2])
+
+        # only a field with a typecode takes them
+        with self.assertRaises(Invalid):
+            ArrayField(float).validate(array.array("d", [1.5]))
+
+        assert self.Series(samples=[1.5], counts=[1]).validate()
+        self.assertEqual([], self.Series(samples=[1.5]).errors())
+        series = self.Series(samples=[1.5], counts=array.array("d", [0.5]))
+        self.assertEqual(["counts.0"], [p for p, _ in series.errors()])
+
+    def test_numpy_validation(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy isn't installed")
+
+        field = ArrayField(float, typecode="d")
+        assert field.validate(numpy.array([1.5, 2.5]))
+        with self.assertRaises(Invalid):
+            field.validate(numpy.array([1, 2]))
+        self.assertEqual([1.5, 2.5],
+                         field.serialize(numpy.array([1.5, 2.5])))
+
+    def test_typed_array_serialization(self):
+        field = ArrayField(int, typecode="l")
+        self.assertEqual([0, 1], field.serialize(array.array("l", [0, 1])))
+        self.assertEqual([0, 1], field.serialize([0, 1]))
+
+        series = self.Series(samples=[0.0, 1.5], counts=[0])
+        expected = {"samples": [0.0, 1.5], "counts": [0]}
+        for implicit_nulls in (True, False):
+            flat = series.serialize(implicit_nulls=implicit_nulls)
+            self.assertEqual(expected, flat)
+            self.assertIs(list, type(flat["samples"]))
+
+    def test_raw_values_are_lists(self):
+        class Everything(Mapping):
+            everything = All()
+
+        series = self.Series(samples=[0.0, 1.5], counts=[0])
+        expected = {"samples": [0.0, 1.5], "counts": [0]}
+        self.assertEqual(expected, series._raw.serialize())
+        self.assertIs(list, type(series._raw.samples))
+
+        result = Everything().apply(series).serialize()
+        self.assertEqual({"everything": expected},
+                         json.loads(json.dumps(result)))
+
+        generic = GenericSchema(samples=array.array("d", [0.5]))
+        self.assertEqual({"samples": [0.5]}, generic.serialize())
@@ -0,0 +1,138 @@
+from unittest import TestCase
+
+from bfh import Mapping, Schema
+from bfh.fields import ArrayField, IntegerField, Subschema, UnicodeField
+from bfh.fusion import FusedMapping, fuse
+from bfh.transformations import (
+    All,
+    Concat,
+    Const,
+    Do,
+    Get,
+    ManySubmap,
+    Str,
+    Submapping,
+)
+
+calls = []
+
+
+def track(value):
+    calls.append(value)
+    return value
+
+
+class Person(Schema):
+    name = UnicodeField()
+    nick = UnicodeField(default=u"anon")
+
+
+class Book(Schema):
+    title = UnicodeField()
+    author = Subschema(Person)
+    readers = ArrayField(Person)
+    pages = IntegerField()
+    tracked = UnicodeField()
+
+
+class Shelf(Schema):
+    headline = UnicodeField()
+    nick = UnicodeField()
+    pages = IntegerField()
+
+
+class ToPerson(Mapping):
+    target_schema = Person
+
+    name = Get("n")
+
+
+class VendorToBook(Mapping):
+    target_schema = Book
+
+    title = Str(Get("t"))
+    author = Submapping(ToPerson, Get("a"))
+    readers = ManySubmap(ToPerson, Get("r"))
+    pages = Get("p", default=0)
+    tracked = Do(track, Get("t"))
+
+
+class BookToShelf(Mapping):
+    source_schema = Book
+    target_schema = Shelf
+
+    headline = Concat(Get("title"), u" by ", Get("author", "name"))
+    nick = Get("author", "nick")
+    pages = Get("pages")
+
+
+class BookToGeneric(Mapping):
+    everything = All()
+    first_reader = Do(lambda r: r[0].name if r else None, Get("readers"))
+    missing = Get("nope", default=u"x")
+    pages = Get("pages", default=10)
+
+
+class ShelfToLabel(Mapping):
+    label = Concat(Get("headline"), u", ", Str(Get("pages")))
+    constant = Const(1)
+
+
+class TestFusion(TestCase):
+    def setUp(self):
+        calls[:] = []
+        self.blobs = [
+            {"t": u"Moby Dick", "a": {"n": u"Herman"},
+             "r": [{"n": u"Ishmael"}], "p": 635},
+            {"t": u"Untitled", "a": None, "r": None, "p": None},
+            {},
+        ]
+
+    def assertFused(self, first, second, fused):
+        for blob in self.blobs:
+            expected = second().apply(first().apply(blob)).serialize()
+            self.assertEqual(expected, fused().apply(blob).serialize())
+            self.assertEqual(expected, fused().apply_serialized(blob))
+
+    def test_same_result(self):
+        fused = fuse(VendorToBook, BookToShelf)
+        self.assertTrue(issubclass(fused, FusedMapping))
+        self.assertEqual("VendorToBookThenBookToShelf", fused.__name__)
+        self.assertFused(VendorToBook, BookToShelf, fused)
+
+    def test_whole_result(self):
+        self.assertFused(VendorToBook, BookToGeneric,
+                         fuse(VendorToBook, BookToGeneric))
+
+    def test_fuse_fused(self):
+        shelf = fuse(VendorToBook, BookToShelf)
+        self.assertFused(shelf, ShelfToLabel, fuse(shelf, ShelfToLabel))
+
+    def test_no_intermediate(self):
+        fused = fuse(VendorToBook, BookToShelf, name="Fused")
+        self.assertEqual("Fused", fused.__name__)
+        self.assertIsInstance(fused().apply(self.blobs[0]), Shelf)
+        self.assertEqual([], calls)
+
+        fuse(VendorToBook, BookToGeneric)().apply(self.blobs[0])
+        self.assertEqual([u"Moby Dick"], calls)
+
+    def test_dependencies(self):
+        fused = fuse(VendorToBook, BookToShelf)
+        self.assertEqual({
+            "headline": frozenset([("t",), ("a",)]),
+            "nick": frozenset([("a",)]),
+            "pages": frozenset([("p",)]),
+        }, fused.dependencies())
+
+    def test_field_names_of_ours(self):
+        class BookToOrdinals(Mapping):
+            first = Get("title")
+            second = Get("pages")
+
+        self.assertFused(VendorToBook, BookToOrdinals,
+                         fuse(VendorToBook, BookToOrdinals))
+
+    def test_incompatible(self):
+        with self.assertRaises(ValueError):
+            fuse(BookToShelf, BookToShelf)
@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+from bfh import Mapping
+from bfh.instrument import Profile, instrument
+from bfh.transformations import Do, Get, Int, ManySubmap, Str
+
+
+class Inner(Mapping):
+    name = Str(Get("name"))
+
+
+class Outer(Mapping):
+    instrumented = True
+
+    id = Int(Get("id"))
+    ratio = Do(lambda x: 1.0 / x, Get("n"))
+    missing = Get("nope")
+    items = ManySubmap(Inner, Get("items"))
+
+
+class CompiledOuter(Outer):
+    compiled = True
+
+
+class TestInstrument(TestCase):
+    def setUp(self):
+        Outer.profile.reset()
+        CompiledOuter.profile.reset()
+
+    def test_counts(self):
+        for mapping in (Outer, CompiledOuter):
+            mapping().apply({"id": "1", "n": 2, "items": [{"name": "a"}]})
+            mapping().apply({"id": "2", "n": 4})
+
+            profile = mapping.profile
+            self.assertEqual(set(["id", "ratio", "missing", "items"]),
+                             set(profile.fields()))
+            self.assertEqual(2, profile["id"].calls)
+            self.assertEqual(2, profile["id.0"].calls)
+            self.assertEqual("Get", profile["id.0"].kind)
+            self.assertEqual(0, profile["ratio"].errors)
+            self.assertEqual(2, profile["missing"].nulls)
+            self.assertTrue(profile["id"].total >= profile["id.0"].total)
+            self.assertTrue(profile["id"].max <= profile["id"].total)
+
+            # which other fields run before it fails depends on their order
+            with self.assertRaises(ZeroDivisionError):
+                mapping().apply({"id": "3", "n": 0})
+            self.assertEqual(1, profile["ratio"].errors)
+            self.assertEqual(3, profile["ratio.1"].calls)
+            self.assertEqual(0, profile["ratio.1"].errors)
+
+    def test_results_unchanged(self):
+        blob = {"id": "1", "n": 2, "items": [{"name": "a"}]}
+        self.assertEqual(
+            {"id": 1, "ratio": 0.5, "missing": None, "items": [{"name": "a"}]},
+            Outer().apply(blob).serialize())
+        self.assertEqual({"items": [{"name": "a"}]},
+                         Outer().apply_serialized(blob, only=["items.name"]))
+        self.assertEqual(2, Outer.profile["items"].calls)
+        self.assertEqual(1, Outer.profile["id"].calls)
+
+    def test_leaves_tree_alone(self):
+        self.assertIsNone(Inner.profile)
+        self.assertIsInstance(Inner._fields["name"], Str)
+        self.assertIsInstance(Outer.id, Int)
+        self.assertIsInstance(Outer.id.args[0], Get)
+
+    def test_report(self):
+        Outer().apply({"id": "1", "n": 4})
+        report = Outer.profile.report(sort="path")
+        lines = report.splitlines()
+        self.assertEqual(["node", "kind", "calls"], lines[0].split()[:3])
+        self.assertEqual(["id", "Int", "1"], lines[1].split()[:3])
+        self.assertEqual(1, Outer.profile.as_dict()["ratio"]["calls"])
+        self.assertEqual(4, len(Outer.profile.slowest(4)))
+
+    def test_instrument(self):
+        profile = Profile()
+        node = instrument(Str(Get("a")), profile, "a")
+        self.assertEqual("1", node({"a": 1}))
+        self.assertEqual(["a", "a.0"], list(profile.nodes))
@@ -1,4 +1,5 @@
 import datetime
+import pickle
 from unittest import TestCase
 
 from bfh import Schema, Mapping, GenericSchema
@@ -24,6 +25,7 @@ from bfh.transformations import (
     Str,
     ParseDate,
     Submapping,
+    _parse_iso_8601,
     utc,
 )
 
@@ -211,6 +213,37 @@ class TestGet(TestCase):
         with self.assertRaises(Missing):
             Get("other", required=True)(my_dict)
 
+    def test_mixed_dicts_and_objects(self):
+        class MyObj(object):
+            inner = {"path": "goal"}
+        my_dict = {"obj": MyObj()}
+        self.assertEqual("goal", Get("obj", "inner", "path")(my_dict))
+        self.assertEqual("goal",
+                         Get("obj", "inner", "path", required=True)(my_dict))
+
+        with self.assertRaises(Missing):
+            Get("obj", "outer", "path", required=True)(my_dict)
+
+    def test_default_applies_at_every_step(self):
+        my_dict = {"path": None}
+        self.assertEqual("x", Get("path", "deeper", default="x")(my_dict))
+        self.assertEqual("x", Get("nope", default="x")({}))
+        self.assertIsNone(Get("path", "deeper")(my_dict))
+
+    def test_subclass_can_change_lookup(self):
+        class Shouting(Get):
+            def _get_from_dict(self, source, path):
+                return source.get(path.upper())
+
+        self.assertEqual("goal", Shouting("path")({"PATH": "goal"}))
+
+    def test_pickles(self):
+        for get in (Get("a", "b"), Get("a", "b", required=True)):
+            copied = pickle.loads(pickle.dumps(get))
+            self.assertEqual(1, copied({"a": {"b": 1}}))
+        self.assertEqual("x", pickle.loads(pickle.dumps(
+            Get("a", "b", default="x")))({"a": {}}))
+
 
 class TestCoerce(TestCase):
     def test_can_coerce_int(self):
@@ -301,6 +334,62 @@ class TestDo(TestCase):
         self.assertEqual(6, result)
 
 
+class TestCachedDo(TestCase):
+    def setUp(self):
+        self.calls = calls = []
+
+        def lookup(*args):
+            calls.append(args)
+            return len(args)
+
+        self.lookup = lookup
+
+    def test_caches_results(self):
+        do = Do(self.lookup, Get('a'), Get('b'), cache=2)
+        for blob in [{"a": 1}, {"a": 1}, {"a": 2}, {"a": 1}, {"a": 3},
+                     {"a": 2}]:
+            self.assertEqual(2, do(blob))
+
+        self.assertEqual([(1, None), (2, None), (3, None), (2, None)],
+                         self.calls)
+        info = do.cache_info()
+        self.assertEqual(2, info["hits"])
+        self.assertEqual(4, info["misses"])
+        self.assertEqual(2, info["evictions"])
+        self.assertEqual(2, info["size"])
+        self.assertEqual(0, info["unhashable"])
+
+    def test_equal_args_of_other_types(self):
+        do = Do(repr, Get('a'), cache=10)
+        for _ in range(2):
+            self.assertEqual(["1", "True", "1.0"],
+                             [do({"a": a}) for a in (1, True, 1.0)])
+
+    def test_unhashable_args_not_cached(self):
+        do = Do(self.lookup, Get('a'), cache=10)
+        do({"a": [1]})
+        do({"a": [1]})
+        self.assertEqual(2, len(self.calls))
+        self.assertEqual(2, do.cache_info()["unhashable"])
+
+    def test_not_cached_by_default(self):
+        do = Do(self.lookup, Const(1))
+        do()
+        do()
+        self.assertEqual(2, len(self.calls))
+        self.assertIsNone(do.cache_info())
+
+    def test_in_compiled_mapping(self):
+        class Cached(Mapping):
+            compiled = True
+            value = Do(self.lookup, Get('a'), cache=10)
+
+        for _ in range(3):
+            self.assertEqual(1, Cached().apply({"a": 1}).value)
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual(2, Cached.value.cache_info()["hits"])
+
+
 class TestChain(TestCase):
     def test_can_chain_lists(self):
         list_one = [1, 2]
@@ -365,6 +454,55 @@ class TestParseDate(TestCase):
                              result)
 
 
+class TestFastParseDate(TestCase):
+    def test_same_as_dateutil(self):
+        from dateutil.parser import parse
+        dates = [
+            u'1982-08-12',
+            u'1982-08-12T10:00',
+            u'1982-08-12 10:00:00',
+            u'1982-08-12T10:00:00.5Z',
+            u'1982-08-12T10:00:00.123456-00:00',
+            u'1982-08-12T06:00:00-04:00',
+            u'1982-08-12T15:30:00+0530',
+            u'1982-08-12T15:00:00+05',
+            u'1982-08-12T10:00:00.1234567Z',  # too precise; dateutil's job
+        ]
+        for date in dates:
+            expected = parse(date)
+            if expected.tzinfo is None:
+                expected = expected.replace(tzinfo=utc)
+            result = ParseDate(date)()
+            self.assertEqual(expected, result)
+            self.assertEqual(expected.utcoffset(), result.utcoffset())
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            ParseDate(u'1982-13-12')()
+
+    def test_offset_out_of_range(self):
+        from dateutil.parser import parse
+        for date in (u'1982-08-12T10:00+24:00', u'1982-08-12T10:00-99:99'):
+            self.assertIsNone(_parse_iso_8601(date))
+            try:
+                expected = parse(date)
+            except (ValueError, OverflowError) as error:
+                with self.assertRaises(type(error)):
+                    ParseDate(date)()
+            else:
+                self.assertEqual(expected, ParseDate(date)())
+
+    def test_cache(self):
+        parser = ParseDate(Get('at'), cache=10)
+        for _ in range(3):
+            self.assertEqual(datetime.datetime(1982, 8, 12, 10, tzinfo=utc),
+                             parser({'at': u'1982-08-12T10:00:00Z'}))
+        info = parser.cache_info()
+        self.assertEqual(2, info["hits"])
+        self.assertEqual(1, info["misses"])
+        self.assertIsNone(ParseDate(Get('at')).cache_info())
+
+
 class TestIsoFormatDate(TestCase):
     def test_can_iso_format(self):
         my_birthday = datetime.datetime(1982, 8, 12, 10, tzinfo=utc)
@@ -624,3 +762,106 @@ class TestMany(TestCase):
 
         transformed = HasNone().apply({}).serialize(implicit_nulls=True)
         self.assertEqual({}, transformed)
+
+
+class TestDependencies(TestCase):
+    def test_paths(self):
+        self.assertEqual(frozenset([("a", "b")]), Get("a", "b").dependencies())
+        self.assertEqual(frozenset([("a",), ("b",)]),
+                         Concat(Get("a"), "-", Str(Get("b"))).dependencies())
+        self.assertEqual(frozenset(), Const(1).dependencies())
+        self.assertIsNone(All().dependencies())
+        self.assertIsNone(Concat(Get("a"), All()).dependencies())
+
+    def test_custom_transformations_depend_on_everything(self):
+        from bfh.transformations import Transformation
+
+        class Whole(Transformation):
+            def function(self, source, *call_args):
+                return source
+
+        class Peek(Do):
+            def dependencies(self):
+                return frozenset([("peek",)])
+
+        self.assertIsNone(Whole(Get("a")).dependencies())
+        self.assertEqual(frozenset([("peek",)]),
+                         Peek(len, Get("a")).dependencies())
+
+
+class Wow(Mapping):
+    inner = Get('wow')
+
+
+class TestSubmappingReuse(TestCase):
+    def test_submapping_instantiated_once(self):
+        made = []
+
+        class Sub(Mapping):
+            inner = Get('wow')
+
+            def __init__(self):
+                made.append(self)
+
+        class MyMap(Mapping):
+            one = Submapping(Sub, Get('one'))
+            many = ManySubmap(Sub, Get('items'))
+
+        source = {
+            "one": {"wow": 0},
+            "items": [{"wow": 1}, {"wow": 2}, {"wow": 3}],
+        }
+        expected = {
+            "one": {"inner": 0},
+            "many": [{"inner": 1}, {"inner": 2}, {"inner": 3}],
+        }
+        for _ in range(3):
+            self.assertEqual(expected, MyMap().apply(source).serialize())
+
+        self.assertEqual(2, len(made))
+        self.assertIs(MyMap.one.submapping, MyMap.one.submapping)
+
+    def test_pickles_once_used(self):
+        def serialized(result):
+            if isinstance(result, list):
+                return [item.serialize() for item in result]
+            return result.serialize()
+
+        source = {"one": {"wow": 1}, "items": [{"wow": 2}]}
+        for submapping in (Submapping(Wow, Get('one')),
+                           ManySubmap(Wow, Get('items'))):
+            submapping.submapping_applier  # made, and cached
+            copied = pickle.loads(pickle.dumps(submapping))
+            self.assertEqual(serialized(submapping(source)),
+                             serialized(copied(source)))
+
+    def test_submapping_apply_overridden(self):
+        class Sub(Mapping):
+            name = Get('wow')
+
+            def apply(self, blob, **kwargs):
+                result = super(Sub, self).apply(blob, **kwargs)
+                result.extra = u"post"
+                return result
+
+        class MyMap(Mapping):
+            one = Submapping(Sub, Get('one'))
+            many = ManySubmap(Sub, Get('items'))
+
+        class Compiled(MyMap):
+            compiled = True
+
+        source = {"one": {"wow": 1}, "items": [{"wow": 2}]}
+        expected = {
+            "one": {"name": 1, "extra": u"post"},
+            "many": [{"name": 2, "extra": u"post"}],
+        }
+        for mapping in (MyMap(), Compiled()):
+            self.assertEqual(expected, mapping.apply(source).serialize())
+            self.assertEqual(expected, mapping.apply_serialized(source))
+
+        results = Sub().apply_many([{"wow": 1}])
+        self.assertEqual([{"name": 1, "extra": u"post"}],
+                         [result.serialize() for result in results])
+        self.assertEqual({"name": 1, "extra": u"post"},
+                         Sub().apply_serialized({"wow": 1}))